@@ -1,9 +1,21 @@
 class Card:
-    def __init__(self, rank, suit):
-        """Initialize a Card object with a rank, suit, and colour."""
-        self.rank = rank
-        self.suit = suit
-        self.colour = self.get_colour()
+    """
+    A playing card with value semantics. Cards are interned: Card(rank, suit) always returns the same shared instance
+    for a given rank and suit, so the 52 cards of the deck exist only once per process.
+    """
+    __slots__ = ('rank', 'suit', 'colour')
+    _interned = {}
+
+    def __new__(cls, rank, suit):
+        """Return the shared Card for (rank, suit), creating it the first time it is requested."""
+        card = cls._interned.get((rank, suit))
+        if card is None:
+            card = super().__new__(cls)
+            card.rank = rank
+            card.suit = suit
+            card.colour = card.get_colour()
+            cls._interned[(rank, suit)] = card
+        return card
 
     def get_colour(self):
         """Determine the colour of the card based on its suit."""
@@ -17,7 +29,21 @@ class Card:
     def __repr__(self):
         """Return a string representation of the card."""
         return f"{self.rank} of {self.suit} ({self.colour})"
-    
+
+    def __eq__(self, other):
+        """Check if two cards have the same rank and suit."""
+        if isinstance(other, Card):
+            return self.rank == other.rank and self.suit == other.suit
+        return NotImplemented
+
+    def __hash__(self):
+        """Return the hash value of the card, based on its rank and suit."""
+        return hash((self.rank, self.suit))
+
+    def __reduce__(self):
+        """Pickle (and copy) cards through the constructor so they stay interned."""
+        return (Card, (self.rank, self.suit))
+
     def to_dict(self):
         """Convert the card object to a dictionary."""
         return {
@@ -28,6 +54,9 @@ class Card:
 
     @staticmethod
     def from_dict(card_dict):
-        """Create a Card object from a dictionary."""
+        """Return the shared Card described by a dictionary."""
         return Card(card_dict['rank'], card_dict['suit'])
-    
\ No newline at end of file
+
+
+# The full deck, interned up front
+DECK = [Card(rank, suit) for suit in ['hearts', 'diamonds', 'clubs', 'spades'] for rank in range(1, 14)]
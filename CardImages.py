@@ -0,0 +1,81 @@
+import os
+from PIL import Image, ImageTk
+from Card import DECK
+
+# Card Images ---------------------------------------------------------------------------------------------------------------------------------
+
+# The 52 faces are resized once per card size and kept for the whole process, so every FreeCellGUI shares them.
+# Each size is also saved as a single sprite sheet (13 ranks across, one suit per row, in DECK order) under
+# CACHE_DIR, so later runs load one pre-resized image instead of decoding and resizing 52 PNGs.
+# The PhotoImages built from them belong to a Tk root: they are shared by the windows of that root and dropped when
+# it is destroyed.
+CARD_DIR = os.path.join("assets", "cards")
+CACHE_DIR = os.path.join("assets", "cache")
+CARD_SIZE = (60, 90)  # Default (width, height) of a card on the board
+
+_sheets = {}  # (width, height) -> list of the resized PIL images, in DECK order
+_photos = {}  # Tk root -> {(width, height): {card name: PhotoImage}}
+
+
+def card_name(card):
+    """Returns the file name of a card's image."""
+    return f"{card.rank}_of_{card.suit}.png"
+
+def sheet_path(size):
+    """Returns the path of the cached sprite sheet for a card size."""
+    return os.path.join(CACHE_DIR, f"cards_{size[0]}x{size[1]}.png")
+
+def load_faces(size=CARD_SIZE):
+    """
+    Returns the 52 card faces resized to `size`, in DECK order. They come from the cached sprite sheet when there is
+    one; otherwise the faces are resized from assets/cards and the sheet is written for the next run.
+    """
+    size = tuple(size)
+    if size in _sheets:
+        return _sheets[size]
+
+    width, height = size
+    path = sheet_path(size)
+    if os.path.exists(path):
+        with Image.open(path) as sheet:
+            faces = [sheet.crop(((i % 13) * width, (i // 13) * height, (i % 13 + 1) * width, (i // 13 + 1) * height))
+                     for i in range(len(DECK))]
+    else:
+        faces = []
+        sheet = Image.new("RGBA", (13 * width, 4 * height))
+        for i, card in enumerate(DECK):
+            with Image.open(os.path.join(CARD_DIR, card_name(card))) as image:
+                face = image.convert("RGBA").resize(size, Image.LANCZOS)
+            sheet.paste(face, ((i % 13) * width, (i // 13) * height))
+            faces.append(face)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            sheet.save(path)
+        except OSError as e:
+            print(f"Could not cache the card images: {e}")
+
+    _sheets[size] = faces
+    return faces
+
+def preload(root, size=CARD_SIZE):
+    """
+    Builds the PhotoImage of every card for a card size on a Tk root, once; the images are shared by every window of
+    that root until it is destroyed.
+    """
+    photos = _photos.get(root)
+    if photos is None:
+        photos = _photos[root] = {}
+        root.bind("<Destroy>", lambda event: _release(root) if event.widget is root else None, add="+")
+    size = tuple(size)
+    if size not in photos:
+        photos[size] = {card_name(card): ImageTk.PhotoImage(face, master=root)
+                        for card, face in zip(DECK, load_faces(size))}
+    return photos[size]
+
+def card_image(root, card, size=CARD_SIZE):
+    """Returns the shared PhotoImage of a card for a card size on a Tk root."""
+    return preload(root, size)[card_name(card)]
+
+def _release(root):
+    """Drops the PhotoImages of a destroyed Tk root."""
+    _photos.pop(root, None)
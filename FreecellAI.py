@@ -1,105 +1,699 @@
 from collections import deque
 import time
-import tracemalloc
-import FreecellMove as fcm
 import heapq
-from FreecellState import FreecellState
+import itertools
+import multiprocessing
+import queue
+from array import array
+from PackedState import PackedState
+from FreecellLog import log, set_level, enabled, set_monitor, check_cancelled, QUIET, INFO, DEBUG, SolverStats, SolverCancelled
+from FreecellLog import peak_memory_mb, format_memory, POP, MOVES, DEDUP, HEURISTIC, PUSH
+import FreecellCache
 
 
 
 # A Star ------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
-def solve_game_astar(game):
+def solve_game_astar(game, canonical=True, weight=1.0):
     """Solve the Freecell game using the A* search algorithm.
     The algorithm uses a priority queue (open set) to explore game states,
     guided by a heuristic function that estimates the cost to reach the goal.
     It iteratively evaluates possible moves until a solution is found or all
-    states are explored."""
+    states are explored. The search runs on PackedState, the compact
+    solver-side encoding of the game state.
+    With a `weight` above 1 the search runs as weighted A* (f = g + weight * h),
+    which expands far fewer states but may return a longer solution."""
     start_time = time.time()  # Start timer
-    tracemalloc.start()  # Start memory tracking
+    stats = SolverStats("A*" if weight == 1.0 else f"Weighted A* (w={weight})")
     isDone=False
+    optimal = weight == 1.0  # Only reuse cached solutions proven to be the shortest ones
+    complete = True  # Whether every expanded state got all its legal moves, so that running out of states proves them dead
 
     try:
-        # Initialize the open set (priority queue) with the initial game state
+        game = PackedState.from_state(game).apply_automatic_moves()
+        cache = FreecellCache.CACHE
+        if cache is not None:
+            game = cache.shortcut(game, optimal) or game  # A cached solution leads from the start to a solved node
+
+        # Initialize the open set (priority queue) with the initial game state.
+        # Entries are (f_score, g_score, insertion order, state): the insertion counter breaks ties, so states are never compared.
+        counter = itertools.count()
         open_set = []
-        heapq.heappush(open_set, (game.heuristic(), 0, game))
-
-        # Dictionary to keep track of the path
-        came_from = {}
+        heapq.heappush(open_set, (weight * game.heuristic(), 0, next(counter), game))
 
         # Dictionary to keep track of the cost of the cheapest path to a node
-        g_score = {game: 0}
-
-        # Dictionary to keep track of the estimated cost of the cheapest path through a node
-        f_score = {game: game.heuristic()}
+        g_score = {state_key(game, canonical): 0}
 
+        profiler = stats.profiler  # Times each phase of the expansions when profiling is on (see FreecellLog.Profiler)
         while open_set:
-            print(f"Open set size: {len(open_set)}")
             # Get the node in open_set with the lowest f_score
-            _, current_g, current = heapq.heappop(open_set)
+            _, current_g, _, current = heapq.heappop(open_set)
+            stats.tick(len(open_set))
+            if profiler: profiler.lap(POP)
 
             # If the current state is the goal, reconstruct and return the path
             if current.is_solved():
                 isDone=True
                 end_time = time.time()  # End timer
-                current_mem, peak_mem = tracemalloc.get_traced_memory()  # Get memory usage
-                tracemalloc.stop()  # Stop memory tracking
+                peak_mem = peak_memory_mb()
 
-                print(f"Solution found in {end_time - start_time:.4f} seconds!")
-                print(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB")
+                log(INFO, f"Solution found in {end_time - start_time:.4f} seconds!")
+                log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+                stats.report()
+                if cache is not None:
+                    cache.add_solution(current)  # Not proven shortest: the heuristic is not admissible
 
                 with open("statistics_astar.txt", "w") as file:
                     file.write(f"Number of states explored: {len(g_score)}\n")
-                    file.write(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB\n")
+                    file.write(f"Number of states expanded: {stats.expanded}\n")
+                    file.write(f"Peak memory usage: {format_memory(peak_mem)}\n")
                     file.write(f"Time taken: {end_time - start_time:.4f} seconds\n")
 
-                return reconstruct_path_astar(came_from, current)
-
-            # Iterate through the possible moves from the current state
-            for move in current.get_possible_moves_Astar():
-                # Apply the move to get the neighbor state
-                neighbor = current.copy().apply_move(move, True)
-                neighbor = fcm.apply_automatic_moves(neighbor)
+                return reconstruct_path_astar(current)
+
+            # Iterate through the possible moves (and supermoves) from the current state
+            if complete and current.parent is not None:
+                # Generate every move once and prune the reversals here, to see if any were pruned
+                all_moves = current.get_possible_moves_Astar()
+                moves = [move for move in all_moves if not current.reverses(move, current.parent)]
+                complete = len(moves) == len(all_moves)
+            else:
+                moves = current.get_possible_moves_Astar(current.parent)
+            moves += current.get_possible_supermoves()
+            stats.generated += len(moves)
+            if profiler: profiler.lap(MOVES)
+            for move in moves:
+                # Apply the move to get the neighbor state, linked to the current one
+                neighbor = profiler.child(current, move) if profiler else current.child(move)
+                if cache is not None and neighbor in cache:
+                    if cache.is_dead(neighbor):
+                        stats.duplicates += 1
+                        continue
+                    goal = cache.shortcut(neighbor, optimal)
+                    if goal is not None and optimal:
+                        # Popped once no shorter solution can be left in the open set
+                        goal_g = current_g + 1 + cache.distance(neighbor, optimal)
+                        heapq.heappush(open_set, (goal_g, goal_g, next(counter), goal))
+                        continue
+                    if goal is not None:
+                        heapq.heappush(open_set, (float('-inf'), current_g + 1, next(counter), goal))  # Popped next
+                        break
+                key = state_key(neighbor, canonical)
                 tentative_g_score = current_g + 1
 
                 # If this path to neighbor is better than any previous one, record it
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = (current, move)
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + neighbor.heuristic()
-                    heapq.heappush(open_set, (f_score[neighbor], tentative_g_score, neighbor))
-
-            for src, dest, num_cards in fcm.get_possible_supermoves(current):
-                neighbor = current.copy()
-                neighbor = fcm.execute_supermove(neighbor, src, dest, num_cards, True)
-                supermove = f"Supermove(source={src}, destination={dest}, number of cards={num_cards})"
-                # Apply the move to get the neighbor state
-                neighbor = fcm.apply_automatic_moves(neighbor)
-                tentative_g_score = current_g + 1
+                if key not in g_score or tentative_g_score < g_score[key]:
+                    g_score[key] = tentative_g_score
+                    if profiler: profiler.lap(DEDUP)
+                    stats.heuristic_calls += 1
+                    f_score = tentative_g_score + weight * neighbor.heuristic()
+                    if profiler: profiler.lap(HEURISTIC)
+                    heapq.heappush(open_set, (f_score, tentative_g_score, next(counter), neighbor))
+                    if profiler: profiler.lap(PUSH)
+                else:
+                    stats.duplicates += 1
+                    if profiler: profiler.lap(DEDUP)
+
+        # If the open set is empty but the goal was never reached, no state that was reached can be solved,
+        # unless pruned moves led out of them
+        if cache is not None and complete:
+            cache.add_dead(key.state if canonical else key for key in g_score)
+        return None
+
+    except KeyboardInterrupt:
+        log(INFO, "Execution interrupted by user.")
+    finally:
+        if not isDone:
+            peak_mem = peak_memory_mb()
+            log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+            stats.report()
+
+
+# Anytime A* --------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+def anytime_astar(game, weight=5.0, final_weight=1.0, weight_step=1.0, time_limit=10.0, max_states=2_000_000, canonical=True):
+    """
+    Anytime repairing A* (ARA*). Runs weighted A* with a high `weight` to find a first solution fast, then lowers the
+    weight by `weight_step` down to `final_weight`, reusing the states already searched, and yields every shorter
+    solution it finds as a (weight, path) tuple. States that can no longer lead to a shorter solution are pruned.
+    Every weight is searched until it improves the solution. The final weight then goes on until no open state has
+    an unweighted g + h below the best solution length (the smallest weighted f divided by the weight bounds it from
+    below), as plain A* would. The heuristic is not admissible, so this is a cutoff rather than a proof that no shorter
+    solution exists, and it only applies once the final weight found a solution of its own: the g + h of the states
+    left by the higher weights is usually above the best length already. The search also stops when the final weight
+    runs out of states, after `time_limit` seconds or once `max_states` states are stored.
+    """
+    deadline = time.time() + time_limit
+    stats = SolverStats("Anytime A*")
+    profiler = stats.profiler
+    counter = itertools.count()
+
+    start = PackedState.from_state(game).apply_automatic_moves()
+    start_key = state_key(start, canonical)
+    g_score = {start_key: 0}
+    open_nodes = {start_key: start}  # States waiting to be expanded with the current weight
+    inconsistent = {}  # States improved after their expansion, expanded again once the weight is lowered
+    best_length = float('inf')
+
+    try:
+        while True:
+            open_set = [(g_score[key] + weight * node.heuristic(), g_score[key], next(counter), key)
+                        for key, node in open_nodes.items()]
+            heapq.heapify(open_set)
+            closed = set()
+            improved = False  # Whether this weight found a shorter solution
+            log(INFO, f"[Anytime A*] searching with weight {weight}")
+
+            # Expand states until this weight improves the best solution
+            while open_set:
+                f_score, current_g, _, key = heapq.heappop(open_set)
+                if key in closed or current_g > g_score[key]:
+                    continue  # Outdated entry
+                if improved and weight <= final_weight and f_score / weight >= best_length:
+                    log(INFO, f"[Anytime A*] no shorter solution left after {stats.elapsed():.2f}s")
+                    return  # Every open state has g + h >= f / weight, at least the best solution length
+                current = open_nodes.pop(key)
+                closed.add(key)
+                stats.tick(len(open_set))
+                if profiler: profiler.lap(POP)
+                if time.time() > deadline or len(g_score) > max_states:
+                    return
+
+                if current.is_solved():
+                    best_length = current_g
+                    improved = True
+                    log(INFO, f"[Anytime A*] solution of length {best_length} with weight {weight} after {stats.elapsed():.2f}s")
+                    yield weight, reconstruct_path(current)
+                    if weight > final_weight:
+                        break
+                    continue
+                if current_g + 1 >= best_length:
+                    continue  # Every path through this state is at least as long as the best solution
+
+                moves = current.get_possible_moves_Astar(current.parent) + current.get_possible_supermoves()
+                stats.generated += len(moves)
+                if profiler: profiler.lap(MOVES)
+                for move in moves:
+                    neighbor = profiler.child(current, move) if profiler else current.child(move)
+                    neighbor_key = state_key(neighbor, canonical)
+                    tentative_g_score = current_g + 1
+                    if tentative_g_score >= g_score.get(neighbor_key, float('inf')):
+                        stats.duplicates += 1
+                        if profiler: profiler.lap(DEDUP)
+                        continue
+                    g_score[neighbor_key] = tentative_g_score
+                    if neighbor_key in closed:
+                        inconsistent[neighbor_key] = neighbor
+                        if profiler: profiler.lap(DEDUP)
+                    else:
+                        open_nodes[neighbor_key] = neighbor
+                        if profiler: profiler.lap(DEDUP)
+                        stats.heuristic_calls += 1
+                        f_score = tentative_g_score + weight * neighbor.heuristic()
+                        if profiler: profiler.lap(HEURISTIC)
+                        heapq.heappush(open_set, (f_score, tentative_g_score, next(counter), neighbor_key))
+                        if profiler: profiler.lap(PUSH)
+
+            if weight <= final_weight or not (open_nodes or inconsistent):
+                return
+            weight = max(final_weight, weight - weight_step)
+            open_nodes.update(inconsistent)
+            inconsistent = {}
+    finally:
+        stats.report()
+
+def solve_game_anytime(game, weight=5.0, final_weight=1.0, weight_step=1.0, time_limit=10.0, max_states=2_000_000, canonical=True):
+    """
+    Solves the Freecell game with anytime A* (see anytime_astar) and returns the shortest solution found within the
+    time and memory budget, or None if no solution was found. A cancelled run still returns its best solution.
+    """
+    best_path = None
+    try:
+        for _, path in anytime_astar(game, weight, final_weight, weight_step, time_limit, max_states, canonical):
+            best_path = path
+    except KeyboardInterrupt:
+        log(INFO, "Execution interrupted by user.")
+    except SolverCancelled:
+        if best_path is None:
+            raise
+
+    if best_path is not None:
+        log(INFO, f"Solution length: {len(best_path)}")
+        with open("solution_path_anytime.txt", "w") as file:
+            for move in best_path:
+                file.write(f"{move}\n")
+    return best_path
+
+
+# HDA* --------------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+def solve_game_hda(game, workers=None, weight=1.0, batch_size=64, canonical=True):
+    """
+    Solves the Freecell game using hash-distributed A* (HDA*) over `workers` processes (one per CPU by default).
+    Every state is owned by the worker selected by its canonical Zobrist hash, which keeps the open list and g
+    scores of its states. Children owned by another worker are sent to it in batches of `batch_size`, along with the
+    moves that lead to them, so the winning worker can return the full path. The search ends as soon as a worker
+    expands a solved state or, when there is no solution, once every worker is idle and every sent batch has been
+    received. As with solve_game_astar, the heuristic is not admissible, so the solution may not be the shortest.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    start_time = time.time()
+    log(INFO, f"[HDA*] searching with {workers} workers")
+
+    initial_state = PackedState.from_state(game).apply_automatic_moves()
+    if initial_state.is_solved():
+        return reconstruct_path_hda([])
+
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    idle = multiprocessing.Array('b', workers, lock=False)
+    sent = multiprocessing.Array('q', workers, lock=False)  # Batches sent by each worker
+    received = multiprocessing.Array('q', workers, lock=False)  # Batches received by each worker
+    initial = (initial_state.tableau, initial_state.free_cells, initial_state.foundations)
+    processes = [multiprocessing.Process(target=_hda_worker, daemon=True,
+                                         args=(i, inboxes, results, stop, idle, sent, received, initial,
+                                               weight, batch_size, canonical))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    path = None
+    quiet_checks = 0
+    try:
+        while True:
+            try:
+                path = results.get(timeout=0.05)
+                break
+            except queue.Empty:
+                pass
+            check_cancelled()
+            # Termination detection: no worker has work and no batch is in flight, twice in a row
+            if all(idle) and sum(sent) == sum(received):
+                quiet_checks += 1
+                if quiet_checks == 2:
+                    break
+            else:
+                quiet_checks = 0
+            if not any(process.is_alive() for process in processes):
+                break
+    except KeyboardInterrupt:
+        log(INFO, "Execution interrupted by user.")
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+    if path is None:
+        log(INFO, "No solution found.")
+        return None
+    log(INFO, f"Solution found in {time.time() - start_time:.4f} seconds!")
+    return reconstruct_path_hda(path)
+
+def _hda_worker(index, inboxes, results, stop, idle, sent, received, initial, weight, batch_size, canonical):
+    """Runs the part of an HDA* search owned by worker `index` (see solve_game_hda)."""
+    set_monitor(None)  # The coordinator watches for cancellation
+    for inbox in inboxes:
+        inbox.cancel_join_thread()  # Batches still queued when the search stops are dropped
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    stats = SolverStats(f"HDA* worker {index}")
+    counter = itertools.count()
+    open_set = []
+    g_score = {}
+    outboxes = [[] for _ in range(workers)]
+
+    def add(state, g):
+        key = state_key(state, canonical)
+        if g < g_score.get(key, float('inf')):
+            g_score[key] = g
+            stats.heuristic_calls += 1
+            heapq.heappush(open_set, (g + weight * state.heuristic(), g, next(counter), state))
+        else:
+            stats.duplicates += 1
+
+    def receive(batch):
+        idle[index] = 0
+        received[index] += 1
+        for tableau, free_cells, foundations, g, prefix in batch:
+            add(_HdaRoot(tableau, free_cells, foundations, prefix), g)
+
+    def flush(owner):
+        if outboxes[owner]:
+            sent[index] += 1
+            inboxes[owner].put(outboxes[owner])
+            outboxes[owner] = []
+
+    def full_path(state):
+        moves = []
+        while state.parent is not None:
+            moves.append(state.move)
+            state = state.parent
+        moves.reverse()
+        return state.prefix + tuple(moves)
+
+    initial_state = _HdaRoot(*initial, ())
+    if _hda_owner(initial_state, workers) == index:
+        add(initial_state, 0)
+
+    try:
+        while not stop.is_set():
+            # Take in the states other workers sent, blocking only when there is nothing else to do
+            try:
+                while True:
+                    receive(inbox.get_nowait())
+            except queue.Empty:
+                pass
+            if not open_set:
+                for owner in range(workers):
+                    flush(owner)
+                idle[index] = 1
+                try:
+                    receive(inbox.get(timeout=0.05))
+                except queue.Empty:
+                    pass
+                continue
+
+            _, current_g, _, current = heapq.heappop(open_set)
+            if current_g > g_score[state_key(current, canonical)]:
+                continue  # A cheaper path to this state was found after it was queued
+            stats.tick(len(open_set))
+
+            if current.is_solved():
+                results.put(full_path(current))
+                stop.set()
+                break
+
+            moves = current.get_possible_moves_Astar(current.parent) + current.get_possible_supermoves()
+            stats.generated += len(moves)
+            current_path = None
+            for move in moves:
+                neighbor = current.child(move)
+                owner = _hda_owner(neighbor, workers)
+                if owner == index:
+                    add(neighbor, current_g + 1)
+                else:
+                    if current_path is None:
+                        current_path = full_path(current)
+                    outboxes[owner].append((neighbor.tableau, neighbor.free_cells, neighbor.foundations,
+                                            current_g + 1, current_path + (move,)))
+                    if len(outboxes[owner]) >= batch_size:
+                        flush(owner)
+
+            # Don't let small batches wait for too long
+            if stats.expanded % 16 == 0:
+                for owner in range(workers):
+                    flush(owner)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log(DEBUG, f"[HDA* worker {index}] expanded: {stats.expanded}, generated: {stats.generated}, "
+                   f"duplicates: {stats.duplicates}")
 
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = (current, supermove)
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + neighbor.heuristic()
-                    heapq.heappush(open_set, (f_score[neighbor], tentative_g_score, neighbor))
+def _hda_owner(state, workers):
+    """Returns the index of the HDA* worker that owns a state."""
+    return state.canonical % workers
+
+class _HdaRoot(PackedState):
+    """
+    Search node an HDA* worker starts from: the initial state, or a state received from another worker. It keeps the
+    moves that lead to it from the initial state (`prefix`), so the nodes generated from it only link back to it.
+    """
+    __slots__ = ('prefix',)
+
+    def __init__(self, tableau, free_cells, foundations, prefix):
+        super().__init__(tableau, free_cells, foundations)
+        self.prefix = prefix
+
+
+# IDA* --------------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of the states visited by IDA*, allocated once so its memory never grows: each of the
+    2^k slots stores a 64-bit state hash, the depth the state was reached at and the iteration that stored it.
+    A slot is replaced when it is from an older iteration or holds a deeper (so less valuable) entry.
+    States are identified by their 64-bit hash alone; a collision between different states is negligible.
+    The iteration stamps keep counting across searches, so a table can be reused by the next search without clearing it.
+    """
+    __slots__ = ('mask', 'hashes', 'depths', 'iterations', 'iteration')
+
+    ENTRY_BYTES = 8 + 2 + 2
+
+    def __init__(self, max_memory_mb):
+        size = 1
+        while size * 2 * self.ENTRY_BYTES <= max_memory_mb * 1024 * 1024:
+            size *= 2
+        self.mask = size - 1
+        self.hashes = array('Q', [0]) * size
+        self.depths = array('H', [0]) * size
+        self.iterations = array('H', [0]) * size
+        self.iteration = 0
+
+    def next_iteration(self):
+        """Starts a new iteration, whose stamp no slot holds yet (0 marks an empty slot), and returns its stamp."""
+        if self.iteration == 0xFFFF:
+            self.iterations = array('H', [0]) * len(self.iterations)  # Forget the old stamps before reusing them
+            self.iteration = 0
+        self.iteration += 1
+        return self.iteration
+
+    def visit(self, h, depth, iteration):
+        """
+        Records that the state with hash `h` is reached at `depth` in the given iteration. Returns False if it was
+        already reached at the same or a lower depth in this iteration, so searching it again can't find anything new.
+        """
+        slot = h & self.mask
+        if self.iterations[slot] == iteration:
+            if self.hashes[slot] == h:
+                if self.depths[slot] <= depth:
+                    return False
+            elif self.depths[slot] < depth:
+                return True  # Keep the shallower entry
+        self.hashes[slot] = h
+        self.depths[slot] = depth
+        self.iterations[slot] = iteration
+        return True
+
+
+_transposition_table = (None, None)  # (size in MB, table) reused by every IDA* search of this process
+
+
+def get_transposition_table(max_memory_mb):
+    """Returns the IDA* TranspositionTable of this process, allocating it on first use or when its size changes."""
+    global _transposition_table
+    size, table = _transposition_table
+    if size != max_memory_mb:
+        table = TranspositionTable(max_memory_mb)
+        _transposition_table = (max_memory_mb, table)
+    return table
+
+
+def solve_game_idastar(game, max_memory_mb=64, max_depth=200, min_step=6.0, canonical=True):
+    """
+    Solves the Freecell game using iterative deepening A* (IDA*).
+    Each iteration is a depth-first search that cuts every state whose f = g + heuristic exceeds the current bound,
+    and the next bound is the smallest f that was cut, but at least `min_step` above the current one: the heuristic
+    is fractional, so without it the bound would creep up and repeat nearly the same iteration. Only the current
+    path and its siblings are kept in memory, plus a TranspositionTable of at most `max_memory_mb` megabytes, shared
+    by the IDA* searches of the process, that prunes states already reached at the same or a lower depth in the
+    iteration.
+    """
+    start_time = time.time()
+    stats = SolverStats("IDA*")
+    profiler = stats.profiler
+    cache = FreecellCache.CACHE
+    isDone=False
+
+    try:
+        initial_state = PackedState.from_state(game).apply_automatic_moves()
+        if cache is not None:
+            initial_state = cache.shortcut(initial_state) or initial_state
+        table = get_transposition_table(max_memory_mb)
+        bound = initial_state.heuristic()
+        iterations = 0
+
+        while bound < float('inf'):
+            iteration = table.next_iteration()
+            iterations += 1
+            next_bound = float('inf')
+            stack = [(initial_state, 0)]  # (state, depth)
+            log(INFO, f"[IDA*] iteration with bound {bound:.2f}")
+
+            while stack:
+                current, depth = stack.pop()
+                stats.tick(len(stack))
+                if profiler: profiler.lap(POP)
+
+                f = depth + current.heuristic()
+                if profiler: profiler.lap(HEURISTIC)
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+
+                if current.is_solved():
+                    isDone=True
+                    end_time = time.time()
+                    peak_mem = peak_memory_mb()
+
+                    log(INFO, f"Solution found in {end_time - start_time:.4f} seconds!")
+                    log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+                    stats.report()
+                    if cache is not None:
+                        cache.add_solution(current)
+                    with open("statistics_idastar.txt", "w") as file:
+                        file.write(f"Iterations: {iterations}\n")
+                        file.write(f"Number of states expanded: {stats.expanded}\n")
+                        file.write(f"Peak memory usage: {format_memory(peak_mem)}\n")
+                        file.write(f"Time taken: {end_time - start_time:.4f} seconds\n")
+                    return reconstruct_path_idastar(current)
+
+                visited = depth >= max_depth or not table.visit(current.canonical if canonical else current.zobrist, depth, iteration)
+                if profiler: profiler.lap(DEDUP)
+                if visited:
+                    stats.duplicates += 1
+                    continue
+
+                # Push the children so the one with the lowest heuristic is searched first
+                moves = current.get_possible_moves_Astar(current.parent) + current.get_possible_supermoves()
+                stats.generated += len(moves)
+                if profiler: profiler.lap(MOVES)
+                children = [profiler.child(current, move) if profiler else current.child(move) for move in moves]
+                if cache is not None:
+                    children = [cache.shortcut(child) or child for child in children
+                                if child not in cache or not cache.is_dead(child)]
+                children.sort(key=PackedState.heuristic, reverse=True)
+                if profiler: profiler.lap(HEURISTIC)
+                for child in children:
+                    f = depth + 1 + child.heuristic()
+                    if f > bound:
+                        next_bound = min(next_bound, f)  # Cut right away instead of after being pushed and popped
+                    else:
+                        stack.append((child, depth + 1))
+                if profiler: profiler.lap(PUSH)
+
+            bound = max(next_bound, bound + min_step)
+
+        log(INFO, "No solution found.")
+        return None
+
+    except KeyboardInterrupt:
+        log(INFO, "Execution interrupted by user.")
+    finally:
+        if not isDone:
+            peak_mem = peak_memory_mb()
+            log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+            stats.report()
+
+
+# Beam Search -------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+def solve_game_beam(game, width=500, max_depth=200, restarts=3, width_factor=4, canonical=True):
+    """
+    Solves the Freecell game using beam search.
+    Every layer keeps only the `width` states with the lowest heuristic among the children of the previous layer,
+    so each attempt expands at most width * max_depth states. States are deduplicated within a layer and against
+    every earlier layer. When the beam dies out or reaches `max_depth`, the search restarts from scratch with a beam
+    `width_factor` times wider, up to `restarts` times. Returns None if every attempt fails.
+    """
+    start_time = time.time()
+    stats = SolverStats("Beam")
+    profiler = stats.profiler
+    isDone=False
 
-        #If the open set is empty but the goal was never reached
+    try:
+        initial_state = PackedState.from_state(game).apply_automatic_moves()
+        cache = FreecellCache.CACHE
+        if cache is not None:
+            initial_state = cache.shortcut(initial_state) or initial_state
+
+        for attempt in range(restarts + 1):
+            log(INFO, f"[Beam] attempt {attempt + 1} with width {width}")
+            layer = [initial_state]
+            visited = {state_key(initial_state, canonical)}  # Keys of every state that entered the beam
+
+            for depth in range(max_depth + 1):
+                for current in layer:
+                    if current.is_solved():
+                        isDone=True
+                        end_time = time.time()
+                        peak_mem = peak_memory_mb()
+
+                        log(INFO, f"Solution found in {end_time - start_time:.4f} seconds!")
+                        log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+                        stats.report()
+                        if cache is not None:
+                            cache.add_solution(current)
+                        with open("statistics_beam.txt", "w") as file:
+                            file.write(f"Beam width: {width}\n")
+                            file.write(f"Attempts: {attempt + 1}\n")
+                            file.write(f"Number of states expanded: {stats.expanded}\n")
+                            file.write(f"Peak memory usage: {format_memory(peak_mem)}\n")
+                            file.write(f"Time taken: {end_time - start_time:.4f} seconds\n")
+                        return reconstruct_path_beam(current)
+
+                if depth == max_depth:
+                    break
+
+                # Children of the whole layer, deduplicated within the layer and against the earlier layers
+                candidates = {}
+                for current in layer:
+                    stats.tick(len(layer))
+                    if profiler: profiler.lap(POP)
+                    moves = current.get_possible_moves_Astar(current.parent) + current.get_possible_supermoves()
+                    stats.generated += len(moves)
+                    if profiler: profiler.lap(MOVES)
+                    for move in moves:
+                        neighbor = profiler.child(current, move) if profiler else current.child(move)
+                        if cache is not None and neighbor in cache:
+                            if cache.is_dead(neighbor):
+                                stats.duplicates += 1
+                                continue
+                            neighbor = cache.shortcut(neighbor) or neighbor  # Solved nodes have the lowest heuristic
+                        key = state_key(neighbor, canonical)
+                        if key in visited or key in candidates:
+                            stats.duplicates += 1
+                        else:
+                            candidates[key] = neighbor
+                        if profiler: profiler.lap(DEDUP)
+
+                if not candidates:
+                    break  # The beam died out
+                stats.heuristic_calls += len(candidates)
+                if profiler:
+                    for state in candidates.values():
+                        state.heuristic()  # Cached, so the selection below only times the selection
+                    profiler.lap(HEURISTIC)
+                best = heapq.nsmallest(width, candidates.items(), key=lambda item: item[1].heuristic())
+                visited.update(key for key, _ in best)
+                layer = [state for _, state in best]
+                if profiler: profiler.lap(PUSH)
+
+            width *= width_factor
+
+        log(INFO, "No solution found.")
         return None
 
     except KeyboardInterrupt:
-        print("Execution interrupted by user.")
+        log(INFO, "Execution interrupted by user.")
     finally:
         if not isDone:
-            current_mem, peak_mem = tracemalloc.get_traced_memory()  # Get memory usage
-            tracemalloc.stop()
-            print(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB")
+            peak_mem = peak_memory_mb()
+            log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+            stats.report()
 
 
 # BFS ---------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
-def solve_game_bfs(game):
+def solve_game_bfs(game, canonical=True):
     """
     Solves the Freecell game using breadth-first search (BFS).
     This algorithm explores the state space level by level, ensuring that the
@@ -108,82 +702,94 @@ def solve_game_bfs(game):
     If no solution exists, it returns None.
     """
     start_time = time.time()  # Start timer
-    tracemalloc.start()  # Start memory tracking
+    stats = SolverStats("BFS")
+    profiler = stats.profiler
     isDone=False
 
     try:
-        initial_state = game.copy()
+        initial_state = PackedState.from_state(game).apply_automatic_moves()
+        cache = FreecellCache.CACHE
+        if cache is not None:
+            initial_state = cache.shortcut(initial_state, optimal=True) or initial_state
         queue = deque()
         queue.append((initial_state, 0))  # Tuple: (state, depth)
-        came_from = {}  # To reconstruct the path: {child_state: (parent_state, move)}
-        visited = set()
-        visited.add(initial_state)
-
-        while queue:
-            current, depth = queue.popleft()
-
-            # Debug: Print the current depth and state
-            print(f"{depth}")
-            print(f"{len(visited)}")
+        visited = set()  # Keys of the generated states; each state links back to its parent to rebuild the path
+        visited.add(state_key(initial_state, canonical))
+        cached_goal, cached_depth = None, float('inf')  # Shortest solution met through the cache so far
+
+        while queue or cached_goal is not None:
+            if cached_goal is not None and (not queue or queue[0][1] >= cached_depth):
+                current, depth = cached_goal, cached_depth  # No shorter solution is left in the queue
+            else:
+                current, depth = queue.popleft()
+            stats.tick(len(queue))
+            if profiler: profiler.lap(POP)
 
             # Check if we've reached the solved state.
             if current.is_solved():
                 isDone=True
                 end_time = time.time()  # End timer
-                current_mem, peak_mem = tracemalloc.get_traced_memory()  # Get memory usage
-                tracemalloc.stop()  # Stop memory tracking
+                peak_mem = peak_memory_mb()
 
-                print(f"Solution found in {end_time - start_time:.4f} seconds!")
-                print(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB")
+                log(INFO, f"Solution found in {end_time - start_time:.4f} seconds!")
+                log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+                stats.report()
+                if cache is not None:
+                    cache.add_solution(current, optimal=True)
                 with open("statistics_bfs.txt", "w") as file:
-                    file.write(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB\n")
+                    file.write(f"Peak memory usage: {format_memory(peak_mem)}\n")
                     file.write(f"Time taken: {end_time - start_time:.4f} seconds\n")
                     file.write(f"Depth of solution: {depth}\n")
                     file.write(f"Number of states explored: {len(visited)}\n")
-                return reconstruct_path_bfs(came_from, current)
-
-            # Iterate over all possible moves from the current state.
-            for move in current.get_possible_moves(True):
-                type_of_move = move.move_type
-                if type_of_move != "foundation_to_freecell" and type_of_move != "foundation_to_tableau":
-                    neighbor = current.copy().apply_move(move, True)
-                    neighbor=fcm.apply_automatic_moves(neighbor)
-
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        came_from[neighbor] = (current, move)
-                        queue.append((neighbor, depth + 1))
-                        # Debug: Print the move and new state
-
-            for src, dest, num_cards in fcm.get_possible_supermoves(current):
-                neighbor = current.copy()
-                neighbor = fcm.execute_supermove(neighbor, src, dest, num_cards, True)
-                supermove = f"Supermove(source={src}, destination={dest}, number of cards={num_cards})"
-                neighbor = fcm.apply_automatic_moves(neighbor)
-
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    came_from[neighbor] = (current, supermove)
+                return reconstruct_path_bfs(current)
+
+            # Iterate over all possible moves (and supermoves) from the current state.
+            moves = current.get_possible_moves() + current.get_possible_supermoves()
+            stats.generated += len(moves)
+            if profiler: profiler.lap(MOVES)
+            for move in moves:
+                neighbor = profiler.child(current, move) if profiler else current.child(move)
+                if cache is not None and neighbor in cache:
+                    if cache.is_dead(neighbor):
+                        stats.duplicates += 1
+                        continue
+                    goal = cache.shortcut(neighbor, optimal=True)
+                    if goal is not None:
+                        goal_depth = depth + 1 + cache.distance(neighbor, optimal=True)
+                        if goal_depth < cached_depth:
+                            cached_goal, cached_depth = goal, goal_depth
+                        visited.add(state_key(neighbor, canonical))  # Nothing shorter lies beyond it
+                        continue
+                key = state_key(neighbor, canonical)
+
+                if key not in visited:
+                    visited.add(key)
+                    if profiler: profiler.lap(DEDUP)
                     queue.append((neighbor, depth + 1))
-                    # Debug: Print the move and new state
-
-        # If no solution was found
-        print("No solution found.")
+                    if profiler: profiler.lap(PUSH)
+                else:
+                    stats.duplicates += 1
+                    if profiler: profiler.lap(DEDUP)
+
+        # If no solution was found, none of the states that were reached can be solved
+        log(INFO, "No solution found.")
+        if cache is not None:
+            cache.add_dead(key.state if canonical else key for key in visited)
         return None
 
     except KeyboardInterrupt:
-        print("Execution interrupted by user.")
+        log(INFO, "Execution interrupted by user.")
     finally:
         if not isDone:
-            current_mem, peak_mem = tracemalloc.get_traced_memory()  # Get memory usage
-            tracemalloc.stop()
-            print(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB")
+            peak_mem = peak_memory_mb()
+            log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+            stats.report()
 
 
 # DFS ---------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
-def solve_game_dfs(game, max_depth=45):
+def solve_game_dfs(game, max_depth=45, canonical=True):
     """
     Solves the Freecell game using depth-first search (DFS) with a specified depth limit.
     The algorithm explores possible moves in a depth-first manner, backtracking when necessary.
@@ -192,90 +798,203 @@ def solve_game_dfs(game, max_depth=45):
     """
     max_depth_reached = 0
     start_time = time.time()
-    tracemalloc.start()
+    stats = SolverStats("DFS")
+    profiler = stats.profiler
     isDone=False
 
     try:
-        initial_state = game.copy()
+        initial_state = PackedState.from_state(game).apply_automatic_moves()
+        cache = FreecellCache.CACHE
+        if cache is not None:
+            initial_state = cache.shortcut(initial_state) or initial_state
         stack = [(initial_state, 0)]  # (state, depth)
-        came_from = {}
         visited = set()
-        visited.add(initial_state)
+        visited.add(state_key(initial_state, canonical))
 
         while stack:
             current, depth = stack.pop()
             max_depth_reached = max(max_depth_reached, depth)
-            print(f"Depth {depth}")
-            print(f"{len(visited)}")
+            stats.tick(len(stack))
+            if profiler: profiler.lap(POP)
 
             if current.is_solved():
                 isDone=True
                 end_time = time.time()
-                current_mem, peak_mem = tracemalloc.get_traced_memory()
-                tracemalloc.stop()
+                peak_mem = peak_memory_mb()
 
-                print(f"Solution found in {end_time - start_time:.4f} seconds!")
-                print(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB")
+                log(INFO, f"Solution found in {end_time - start_time:.4f} seconds!")
+                log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+                stats.report()
+                if cache is not None:
+                    cache.add_solution(current)
                 with open("statistics_dfs.txt", "w") as file:
                     file.write(f"Max depth reached: {max_depth_reached}\n")
                     file.write(f"States explored: {len(visited)}\n")
-                    file.write(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB\n")
+                    file.write(f"Peak memory usage: {format_memory(peak_mem)}\n")
                     file.write(f"Time taken: {end_time - start_time:.4f} seconds\n")
-                return reconstruct_path_dfs(came_from, current)
+                return reconstruct_path_dfs(current)
 
             if depth >= max_depth:
                 continue  # Skip expanding this node
 
-            for move in current.get_possible_moves(True):
-                type_of_move = move.move_type
-                if type_of_move not in ("foundation_to_freecell", "foundation_to_tableau"):
-                    neighbor = current.copy().apply_move(move, True)
-                    neighbor = fcm.apply_automatic_moves(neighbor)
-
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        came_from[neighbor] = (current, move)
-                        stack.append((neighbor, depth + 1))
-
-            for src, dest, num_cards in fcm.get_possible_supermoves(current):
-                neighbor = current.copy()
-                neighbor = fcm.execute_supermove(neighbor, src, dest, num_cards, True)
-                supermove = f"Supermove(source={src}, destination={dest}, number of cards={num_cards})"
-                neighbor = fcm.apply_automatic_moves(neighbor)
-
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    came_from[neighbor] = (current, supermove)
+            moves = current.get_possible_moves() + current.get_possible_supermoves()
+            stats.generated += len(moves)
+            if profiler: profiler.lap(MOVES)
+            for move in moves:
+                neighbor = profiler.child(current, move) if profiler else current.child(move)
+                if cache is not None and neighbor in cache:
+                    if cache.is_dead(neighbor):
+                        stats.duplicates += 1
+                        continue
+                    goal = cache.shortcut(neighbor)
+                    if goal is not None:
+                        stack.append((goal, depth + 1))  # Expanded next
+                        break
+                key = state_key(neighbor, canonical)
+
+                if key not in visited:
+                    visited.add(key)
+                    if profiler: profiler.lap(DEDUP)
                     stack.append((neighbor, depth + 1))
+                    if profiler: profiler.lap(PUSH)
+                else:
+                    stats.duplicates += 1
+                    if profiler: profiler.lap(DEDUP)
 
-        print("No solution found.")
+        log(INFO, "No solution found.")
         return None
 
     except KeyboardInterrupt:
-        print("Execution interrupted by user.")
+        log(INFO, "Execution interrupted by user.")
     finally:
         if not isDone:
-            current_mem, peak_mem = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            print(f"Peak memory usage: {peak_mem / 1024 / 1024:.4f} MB")
-            print(f"Maximum depth reached: {max_depth_reached}")
+            peak_mem = peak_memory_mb()
+            log(INFO, f"Peak memory usage: {format_memory(peak_mem)}")
+            log(INFO, f"Maximum depth reached: {max_depth_reached}")
+            stats.report()
+
+
+# Portfolio ---------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+# Strategies raced by solve_game_portfolio: (name, solver, keyword arguments, heuristic weights or None for the defaults).
+# Greedy best-first search is A* with a weight large enough that the heuristic alone orders the open set.
+PORTFOLIO = [
+    ("A*", solve_game_astar, {}, None),
+    ("A* (foundation weights)", solve_game_astar, {},
+     {'foundation': 1.0, 'fc': 0.1, 'fcol': -0.5, 'blocked': 0.3, 'modifier': 1}),
+    ("Weighted A*", solve_game_astar, {'weight': 3.0}, None),
+    ("Greedy best-first", solve_game_astar, {'weight': 1000.0}, None),
+    ("DFS", solve_game_dfs, {'max_depth': 60}, None),
+]
+
+
+def race_solvers(game, strategies=None, time_limit=None):
+    """
+    Runs every strategy of the portfolio (PORTFOLIO by default) in its own process and returns (name, path) for the
+    first one that finds a solution, or (None, None) if they all fail or `time_limit` seconds pass. The other
+    processes are stopped as soon as a strategy wins.
+    """
+    strategies = strategies or PORTFOLIO
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_portfolio_worker, daemon=True,
+                                         args=(name, solver, kwargs, weights, game, results))
+                 for name, solver, kwargs, weights in strategies]
+    for process in processes:
+        process.start()
+
+    deadline = time.time() + time_limit if time_limit is not None else float('inf')
+    winner, path = None, None
+    remaining = len(processes)
+    try:
+        while remaining and time.time() < deadline:
+            try:
+                name, result = results.get(timeout=0.05)
+            except queue.Empty:
+                check_cancelled()
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break  # Every strategy is gone without reporting
+                continue
+            remaining -= 1
+            if result is not None:
+                winner, path = name, result
+                break
+            log(INFO, f"[Portfolio] {name} found no solution")
+    except KeyboardInterrupt:
+        log(INFO, "Execution interrupted by user.")
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    return winner, path
+
+def solve_game_portfolio(game, strategies=None, time_limit=None):
+    """
+    Solves the Freecell game by racing several solvers in parallel processes (see race_solvers). Returns the
+    solution of the first strategy that finds one and records which strategy won.
+    """
+    start_time = time.time()
+    winner, path = race_solvers(game, strategies, time_limit)
+    if path is None:
+        log(INFO, "No solution found.")
+        return None
+
+    log(INFO, f"[Portfolio] {winner} won in {time.time() - start_time:.4f} seconds with a solution of length {len(path)}")
+    with open("statistics_portfolio.txt", "w") as file:
+        file.write(f"Winning strategy: {winner}\n")
+        file.write(f"Solution length: {len(path)}\n")
+        file.write(f"Time taken: {time.time() - start_time:.4f} seconds\n")
+    return path
+
+def _portfolio_worker(name, solver, kwargs, weights, game, results):
+    """Runs one portfolio strategy and sends (name, path) back; path is None if the solver failed."""
+    set_monitor(None)  # The race watches for cancellation
+    if not enabled(DEBUG):
+        set_level(QUIET)  # Only the race itself is reported
+    if weights is not None:
+        game.set_heuristic_weights(**weights)
+    try:
+        path = solver(game, **kwargs)
+    except Exception as e:
+        log(DEBUG, f"[Portfolio] {name} failed: {e}")
+        path = None
+    results.put((name, path))
 
 
 # Auxiliary functions -----------------------------------------------------------------------------------------------------------------------------------------
 
 
-def reconstruct_path_bfs(came_from, current):
+def state_key(state, canonical):
+    """
+    Returns the key used for a state in the duplicate-detection tables (visited, g_score). The searches take a
+    `canonical` flag, on by default: with it, states that only differ in column order or free cell slots get the same
+    key and are treated as duplicates.
+    """
+    return state.canonical_key() if canonical else state
+
+def reconstruct_path(current):
     """
-    Reconstructs the path from the goal to the start using the BFS algorithm's `came_from` mapping.
+    Reconstructs the path from the start to `current` by following the parent links of the search nodes.
+    Supermoves are returned in the "Supermove(...)" format that FreecellGui replays.
     """
     total_path = []
-    while current in came_from:
-        current, move = came_from[current]
+    for move in current.path():
+        if isinstance(move, tuple):
+            src, dest, num_cards = move
+            move = f"Supermove(source={src}, destination={dest}, number of cards={num_cards})"
         total_path.append(move)
-    total_path.reverse()  # Reverse the path to get it from start to goal
+    return total_path
+
+def reconstruct_path_bfs(current):
+    """
+    Reconstructs the path from the goal to the start using the BFS algorithm's search nodes.
+    """
+    total_path = reconstruct_path(current)
 
-    # Print the total path length
-    print(f"{len(total_path)}\n")
+    log(INFO, f"Solution length: {len(total_path)}")
     
     # Write the total path to a file
     with open("solution_path_bfs.txt", "w") as file:
@@ -284,18 +1003,13 @@ def reconstruct_path_bfs(came_from, current):
 
     return total_path
 
-def reconstruct_path_astar(came_from, current):
+def reconstruct_path_astar(current):
     """
-    Reconstructs the path from the goal to the start using the A* algorithm's `came_from` mapping.
+    Reconstructs the path from the goal to the start using the A* algorithm's search nodes.
     """
-    total_path = []
-    while current in came_from:
-        current, move = came_from[current]
-        total_path.append(move)
-    total_path.reverse()  # Reverse the path to get it from start to goal
+    total_path = reconstruct_path(current)
 
-    # Print the total path length
-    print(f"{len(total_path)}\n")
+    log(INFO, f"Solution length: {len(total_path)}")
     
     # Write the total path to a file
     with open("solution_path_astar.txt", "w") as file:
@@ -304,18 +1018,60 @@ def reconstruct_path_astar(came_from, current):
 
     return total_path
 
-def reconstruct_path_dfs(came_from, current):
+def reconstruct_path_idastar(current):
     """
-    Reconstructs the path from the goal to the start using the DFS algorithm's `came_from` mapping.
+    Reconstructs the path from the goal to the start using the IDA* algorithm's search nodes.
     """
-    total_path = []
-    while current in came_from:
-        current, move = came_from[current]
-        total_path.append(move)
-    total_path.reverse()  # Reverse the path to get it from start to goal
+    total_path = reconstruct_path(current)
+
+    log(INFO, f"Solution length: {len(total_path)}")
+
+    # Write the total path to a file
+    with open("solution_path_idastar.txt", "w") as file:
+        for move in total_path:
+            file.write(f"{move}\n")
 
-    # Print the total path length
-    print(f"{len(total_path)}\n")
+    return total_path
+
+def reconstruct_path_beam(current):
+    """
+    Reconstructs the path from the goal to the start using the beam search algorithm's search nodes.
+    """
+    total_path = reconstruct_path(current)
+
+    log(INFO, f"Solution length: {len(total_path)}")
+
+    # Write the total path to a file
+    with open("solution_path_beam.txt", "w") as file:
+        for move in total_path:
+            file.write(f"{move}\n")
+
+    return total_path
+
+def reconstruct_path_hda(moves):
+    """
+    Formats the moves found by HDA* like reconstruct_path, since the path crosses worker processes and can't be
+    rebuilt from parent links.
+    """
+    total_path = [f"Supermove(source={move[0]}, destination={move[1]}, number of cards={move[2]})"
+                  if isinstance(move, tuple) else move for move in moves]
+
+    log(INFO, f"Solution length: {len(total_path)}")
+
+    # Write the total path to a file
+    with open("solution_path_hda.txt", "w") as file:
+        for move in total_path:
+            file.write(f"{move}\n")
+
+    return total_path
+
+def reconstruct_path_dfs(current):
+    """
+    Reconstructs the path from the goal to the start using the DFS algorithm's search nodes.
+    """
+    total_path = reconstruct_path(current)
+
+    log(INFO, f"Solution length: {len(total_path)}")
     
     # Write the total path to a file
     with open("solution_path_dfs.txt", "w") as file:
@@ -328,7 +1084,6 @@ def reconstruct_path_dfs(came_from, current):
 # Functions for A* weight testing --------------------------------------------------------------------------------------------------------------------------------------------------------
 
  
-import itertools
 import csv
 import os
 from concurrent.futures import ProcessPoolExecutor, TimeoutError
@@ -343,6 +1098,7 @@ def frange(start, stop, step):
 
 
 def run_astar_with_weights(game, foundation_weight, fc_weight, fcol_weight, blocked_weight, modifier):
+    FreecellCache.set_cache(None)  # Every combination searches from scratch
     game.set_heuristic_weights(foundation_weight, fc_weight, fcol_weight, blocked_weight, modifier)
     start_time = time.time()
     path = solve_game_astar(game)
@@ -391,14 +1147,14 @@ def grid_search(game, weight_ranges, timeout, results_file="heuristic_test_resul
                     #print("Tested combo:", result)
                     cost = result[5]
                     combo = result[:5]
-                    print("Combo:", combo, "Cost:", cost, "Elapsed:", result[6])
+                    log(INFO, f"Combo: {combo} Cost: {cost} Elapsed: {result[6]}")
                     # Write the combo and the cost + elapsed time to CSV
                     try:
                         with open("heuristic_test_results.csv", mode='a', newline='') as file:
                             writer = csv.writer(file)
                             writer.writerow(combo + (cost, result[6]))  # Add cost and elapsed time to the row
                     except Exception as e:
-                        print("Error writing to CSV:", e)
+                        log(INFO, f"Error writing to CSV: {e}")
     
                     if best is None or cost < best:
                         best = cost
@@ -407,9 +1163,9 @@ def grid_search(game, weight_ranges, timeout, results_file="heuristic_test_resul
                         best_combos.append(combo)
                         
             except TimeoutError:
-                print("Timeout for combination", futures[future])
+                log(INFO, f"Timeout for combination {futures[future]}")
                 timeouts += 1
             except Exception as e:
-                print("Error for combination", futures[future], ":", e)
+                log(INFO, f"Error for combination {futures[future]}: {e}")
 
     return best_combos, best, results
\ No newline at end of file
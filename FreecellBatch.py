@@ -0,0 +1,201 @@
+"""
+Headless batch solver: solves many deals with one of the FreecellAI solvers, without a display.
+
+    python FreecellBatch.py --solver astar --deals 1-1000 --jobs 8 --time-limit 60 --memory-limit 2048 --output results.jsonl
+    python FreecellBatch.py --solver beam --kwargs '{"width": 200}' --presets "Medium" "Super hard" --output results.csv
+
+Every deal is solved in its own process, at most --jobs at a time. A deal that runs past the time limit is stopped,
+along with any processes its solver started (hda, portfolio), and the memory limit caps the address space of its
+process. Results are written as soon as each deal finishes, as
+JSON lines or CSV depending on the output file extension (JSON lines on stdout by default).
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+import time
+import FreecellAI as ai
+import FreecellLog
+from FreecellLog import set_level, set_profiler, peak_memory_mb, Profiler, QUIET
+from FreecellDeals import load_deals, parse_seeds
+
+try:
+    import resource  # Unix only: memory limits
+except ImportError:
+    resource = None
+
+SOLVERS = {
+    'astar': ai.solve_game_astar,
+    'anytime': ai.solve_game_anytime,
+    'beam': ai.solve_game_beam,
+    'bfs': ai.solve_game_bfs,
+    'dfs': ai.solve_game_dfs,
+    'idastar': ai.solve_game_idastar,
+    'hda': ai.solve_game_hda,
+    'portfolio': ai.solve_game_portfolio,
+}
+
+FIELDS = ['deal', 'solver', 'status', 'solved', 'length', 'expanded', 'generated', 'time', 'peak_memory_mb', 'error']
+
+
+# Solving -------------------------------------------------------------------------------------------------------------------------------------
+
+
+def solve_deal(name, game, solver_name, kwargs, memory_limit, connection, verbose=False, profile_dir=None):
+    """
+    Solves one deal in a worker process and sends its result dictionary through `connection`. With `profile_dir`,
+    the run is profiled and its folded stacks are written there as <deal>.folded.
+    """
+    # Turn terminate() into SystemExit, so the solver's cleanup stops the processes it started (hda, portfolio)
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    if not verbose:
+        set_level(QUIET)
+    profiler = Profiler() if profile_dir else None
+    set_profiler(profiler)
+    if memory_limit and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    result = {'deal': name, 'solver': solver_name}
+    start_time = time.time()
+    try:
+        path = SOLVERS[solver_name](game, **kwargs)
+        result['status'] = 'solved' if path is not None else 'unsolved'
+        result['solved'] = path is not None
+        result['length'] = len(path) if path is not None else None
+    except MemoryError:
+        result.update(status='memory limit', solved=False)
+    except Exception as e:
+        result.update(status='error', solved=False, error=repr(e))
+    result['time'] = round(time.time() - start_time, 4)
+
+    stats = FreecellLog.LAST_STATS
+    if stats is not None:
+        result['expanded'] = stats.expanded
+        result['generated'] = stats.generated
+    result['peak_memory_mb'] = peak_memory_mb()
+    if profiler is not None:
+        profiler.write_folded(os.path.join(profile_dir, name.replace(os.sep, '_') + ".folded"))
+    connection.send(result)
+    connection.close()
+
+def _exit_on_sigterm(signum, frame):
+    """SIGTERM handler of the deal workers."""
+    sys.exit(1)
+
+def run_batch(deals, solver_name, kwargs=None, jobs=None, time_limit=None, memory_limit=None, verbose=False,
+              profile_dir=None):
+    """
+    Solves every deal in its own process, running at most `jobs` (one per CPU by default) at a time, and yields the
+    result dictionary of each deal as soon as it finishes. Deals running longer than `time_limit` seconds are stopped.
+    With `profile_dir`, every deal is profiled (see solve_deal).
+    The workers are not daemonic, since the hda and portfolio solvers start processes of their own, so every worker
+    still running when the batch stops early (an error, Ctrl+C or the generator being closed) is terminated here.
+    """
+    kwargs = kwargs or {}
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    jobs = jobs or multiprocessing.cpu_count()
+    pending = list(reversed(deals))
+    running = {}  # Receiving end of the result pipe -> (process, deal name, start time)
+
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                name, game = pending.pop()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=solve_deal,
+                                                  args=(name, game, solver_name, kwargs, memory_limit, sender, verbose,
+                                                        profile_dir))
+                process.start()
+                sender.close()  # Only the worker writes; EOF now means the worker is gone
+                running[receiver] = (process, name, time.time())
+
+            ready = multiprocessing.connection.wait(list(running), timeout=0.1)
+            now = time.time()
+            for receiver in list(running):
+                process, name, start = running[receiver]
+                result = None
+                if receiver in ready:
+                    try:
+                        result = receiver.recv()
+                    except EOFError:  # The worker died without reporting, e.g. killed by the system for its memory use
+                        result = {'deal': name, 'solver': solver_name, 'status': 'crashed', 'solved': False,
+                                  'time': round(now - start, 4)}
+                elif time_limit is not None and now - start > time_limit:
+                    process.terminate()
+                    result = {'deal': name, 'solver': solver_name, 'status': 'timeout', 'solved': False,
+                              'time': round(now - start, 4)}
+                if result is not None:
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    yield result
+    finally:
+        for process, _, _ in running.values():
+            process.terminate()
+        for receiver, (process, _, _) in running.items():
+            process.join()
+            receiver.close()
+
+
+# Output --------------------------------------------------------------------------------------------------------------------------------------
+
+
+def write_results(results, output=None):
+    """Writes result dictionaries as they come, as CSV if `output` ends in .csv, else as JSON lines (stdout if None)."""
+    file = open(output, 'w', newline='') if output else sys.stdout
+    try:
+        writer = None
+        if output and output.endswith('.csv'):
+            writer = csv.DictWriter(file, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+        for result in results:
+            if writer:
+                writer.writerow(result)
+            else:
+                file.write(json.dumps(result) + '\n')
+            file.flush()
+            yield result
+    finally:
+        if output:
+            file.close()
+
+def main(argv=None):
+    """Parses the command line and runs the batch."""
+    parser = argparse.ArgumentParser(description="Solve Freecell deals without the GUI.")
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='astar', help="solver to run on every deal")
+    parser.add_argument('--kwargs', type=json.loads, default={}, help='JSON keyword arguments for the solver, e.g. \'{"weight": 3}\'')
+    parser.add_argument('--deals', type=parse_seeds, default=[], help='Microsoft FreeCell deal numbers, e.g. "1-100,617"')
+    parser.add_argument('--seeds', type=parse_seeds, default=[], help='random deals by seed, e.g. "1-100,250"')
+    parser.add_argument('--presets', nargs='*', default=[], help="names or indices of entries of the presets file")
+    parser.add_argument('--presets-file', default="presets.json", help="presets file in the saves folder")
+    parser.add_argument('--saves', nargs='*', default=[], help="saved-game files in the saves folder")
+    parser.add_argument('--jobs', type=int, default=None, help="deals solved in parallel (default: one per CPU)")
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds allowed per deal")
+    parser.add_argument('--memory-limit', type=int, default=None, help="MB of address space allowed per deal (Unix only)")
+    parser.add_argument('--output', default=None, help="results file, .jsonl or .csv (default: JSON lines on stdout)")
+    parser.add_argument('--verbose', action='store_true', help="keep the solvers' own logging")
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help="profile every deal and write its flame graph stacks to DIR/<deal>.folded")
+    args = parser.parse_args(argv)
+
+    deals = load_deals(args.deals, args.seeds, args.presets, args.saves, args.presets_file)
+    if not deals:
+        parser.error("no deals given (use --deals, --seeds, --presets or --saves)")
+
+    solved = 0
+    start_time = time.time()
+    results = run_batch(deals, args.solver, args.kwargs, args.jobs, args.time_limit, args.memory_limit, args.verbose,
+                        args.profile)
+    for result in write_results(results, args.output):
+        solved += result['solved']
+    print(f"Solved {solved}/{len(deals)} deals in {time.time() - start_time:.2f} seconds.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Solver benchmark suite: runs FreecellAI solvers over a fixed corpus of deals and compares the run with a baseline.
+
+    python FreecellBench.py                              # every default solver, compared with benchmarks/baseline.json
+    python FreecellBench.py --solvers astar beam --save-baseline
+    python FreecellBench.py --threshold 0.05 --time-limit 120
+
+The corpus is the five entries of saves/presets.json plus a fixed list of Microsoft FreeCell deal numbers, so every
+run solves exactly the same deals. Each run is written to benchmarks/ as a JSON file recording the format version,
+the git commit, the machine and, for every (solver, deal), the status, nodes expanded, nodes/sec, solution length,
+wall time and peak memory. Any metric that got worse than the baseline by more than the threshold is reported as a
+regression, and the exit status is 1 so the suite can gate a change.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from FreecellBatch import SOLVERS, run_batch
+from FreecellDeals import load_deals
+
+BENCH_VERSION = 1  # Format version of the results files; bumped when their layout changes
+BENCH_DIR = "benchmarks"
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Corpus --------------------------------------------------------------------------------------------------------------------------------------
+
+BENCH_PRESETS = ['0', '1', '2', '3', '4']  # Every entry of saves/presets.json
+BENCH_DEALS = list(range(1, 11))  # Microsoft FreeCell deals, identical on every machine and Python version
+
+# Solvers run by default, with their settings. The anytime solver is left out since it often runs to its time
+# limit, BFS and DFS because they time out on most of the corpus (so the baseline has nothing to compare), and
+# HDA* and the portfolio because their node counts come from several processes. Any solver can still be benchmarked
+# with --solvers.
+BENCH_SOLVERS = {
+    'astar': {'weight': 3.0},
+    'beam': {},
+    'idastar': {},
+}
+TIME_LIMIT = 60.0  # Seconds per deal
+MEMORY_LIMIT = 2048  # MB of address space per deal
+
+# Metrics compared with the baseline: name -> True if higher is better
+METRICS = {
+    'expanded': False,
+    'nodes_per_sec': True,
+    'length': False,
+    'time': False,
+    'peak_memory_mb': False,
+}
+THRESHOLD = 0.10  # Relative change counted as a regression
+MIN_TIME = 0.1  # Runs faster than this (in seconds) are too noisy to compare on time or nodes/sec
+
+
+# Running -------------------------------------------------------------------------------------------------------------------------------------
+
+
+def git_commit():
+    """Returns the short hash of the checked out commit (with a + if there are local changes), or None."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit.stdout.strip() + ('+' if status.stdout.strip() else '')
+
+def run_benchmarks(solvers=None, jobs=1, time_limit=TIME_LIMIT, memory_limit=MEMORY_LIMIT):
+    """
+    Runs every solver of `solvers` (solver name -> keyword arguments, BENCH_SOLVERS by default) over the corpus and
+    returns the results document. Deals are solved one at a time by default so they don't compete for the CPU.
+    """
+    solvers = BENCH_SOLVERS if solvers is None else solvers
+    deals = load_deals(BENCH_DEALS, presets=BENCH_PRESETS)
+
+    results = []
+    for solver_name, kwargs in solvers.items():
+        for result in run_batch(deals, solver_name, kwargs, jobs, time_limit, memory_limit):
+            expanded = result.get('expanded')
+            result['nodes_per_sec'] = round(expanded / result['time']) if expanded and result['time'] else None
+            print(format_result(result), file=sys.stderr)
+            results.append(result)
+
+    return {
+        'version': BENCH_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        'settings': {'solvers': solvers, 'time_limit': time_limit, 'memory_limit': memory_limit, 'jobs': jobs},
+        'results': results,
+    }
+
+def format_result(result):
+    """One line summary of a benchmark result."""
+    line = f"{result['solver']:<10} {result['deal']:<20} {result['status']:<12} {result['time']:>9.2f}s"
+    if result.get('expanded') is not None:
+        line += f" {result['expanded']:>10} nodes {result['nodes_per_sec'] or 0:>8} nodes/s"
+    if result.get('length') is not None:
+        line += f" {result['length']:>4} moves"
+    return line
+
+
+# Results Files -------------------------------------------------------------------------------------------------------------------------------
+
+
+def save_results(document, path=None):
+    """Writes a results document, by default to benchmarks/<date>-<commit>.json, and returns its path."""
+    if path is None:
+        stamp = document['created'].replace(':', '').replace('-', '')
+        path = os.path.join(BENCH_DIR, f"{stamp}-{document['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(document, file, indent=2)
+    return path
+
+def load_results(path):
+    """Reads a results document, checking its format version."""
+    with open(path) as file:
+        document = json.load(file)
+    if document.get('version') != BENCH_VERSION:
+        raise ValueError(f"{path} has format version {document.get('version')}, expected {BENCH_VERSION}")
+    return document
+
+
+# Regressions ---------------------------------------------------------------------------------------------------------------------------------
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    Compares two results documents and returns the regressions as (solver, deal, metric, baseline, current) tuples.
+    A deal the baseline solved and the current run didn't is a regression on 'status'. Other metrics are compared
+    only when both runs solved the deal, and time-based ones only when the baseline took at least MIN_TIME.
+    """
+    before = {(result['solver'], result['deal']): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = (result['solver'], result['deal'])
+        old = before.get(key)
+        if old is None or not old['solved']:
+            continue
+        if not result['solved']:
+            regressions.append((*key, 'status', old['status'], result['status']))
+            continue
+
+        for metric, higher_is_better in METRICS.items():
+            old_value, new_value = old.get(metric), result.get(metric)
+            if not old_value or new_value is None:
+                continue
+            if metric in ('time', 'nodes_per_sec') and old['time'] < MIN_TIME:
+                continue
+            change = (new_value - old_value) / old_value
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append((*key, metric, old_value, new_value))
+    return regressions
+
+def format_regression(regression):
+    """One line description of a regression."""
+    solver, deal, metric, old, new = regression
+    if metric == 'status':
+        return f"{solver} {deal}: {old} -> {new}"
+    return f"{solver} {deal}: {metric} {old} -> {new} ({(new - old) / old:+.1%})"
+
+
+def main(argv=None):
+    """Parses the command line, runs the benchmarks and compares them with the baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the Freecell solvers on a fixed corpus of deals.")
+    parser.add_argument('--solvers', nargs='*', choices=sorted(SOLVERS), default=None,
+                        help="solvers to run (default: " + ", ".join(BENCH_SOLVERS) + ")")
+    parser.add_argument('--kwargs', type=json.loads, default={},
+                        help='JSON keyword arguments per solver, e.g. \'{"beam": {"width": 200}}\'')
+    parser.add_argument('--jobs', type=int, default=1, help="deals solved in parallel (default: 1, for stable timings)")
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT, help="seconds allowed per deal")
+    parser.add_argument('--memory-limit', type=int, default=MEMORY_LIMIT, help="MB of address space allowed per deal")
+    parser.add_argument('--output', default=None, help="results file (default: benchmarks/<date>-<commit>.json)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="results file to compare with")
+    parser.add_argument('--save-baseline', action='store_true', help="also save this run as the baseline")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    names = args.solvers if args.solvers is not None else list(BENCH_SOLVERS)
+    solvers = {name: {**BENCH_SOLVERS.get(name, {}), **args.kwargs.get(name, {})} for name in names}
+    document = run_benchmarks(solvers, args.jobs, args.time_limit, args.memory_limit)
+    print(f"Results written to {save_results(document, args.output)}", file=sys.stderr)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        baseline = load_results(args.baseline)
+        regressions = compare(baseline, document, args.threshold)
+        print(f"Compared with {args.baseline} (commit {baseline['commit']}): {len(regressions)} regression(s)",
+              file=sys.stderr)
+        for regression in regressions:
+            print("  " + format_regression(regression), file=sys.stderr)
+    else:
+        print(f"No baseline at {args.baseline}", file=sys.stderr)
+
+    if args.save_baseline:
+        save_results(document, args.baseline)
+        print("Saved as the baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
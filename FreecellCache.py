@@ -0,0 +1,222 @@
+"""
+Solver cache shared by the FreecellAI solvers: remembers which states were proven solvable, with their distance to
+the goal and the next move towards it, and which were proven dead, so a new search (after a few manual moves, or
+for a hint) reuses the work of the previous ones instead of expanding the same subtrees again.
+
+States are keyed by their canonical hash, so states that only differ in column order or free cell slots share an
+entry. The next move is therefore stored by card rather than by column (see encode_move), and decoded against the
+state it is replayed on. Every solvable entry also records whether its distance is proven to be the shortest one:
+only BFS, which expands states in order of depth, records such entries (the A* heuristic is not admissible, so
+A* proves nothing about length), and plain A* and BFS only reuse those.
+
+The solvers do not search the states known to the cache again: dead ones are skipped and solvable ones lead straight
+to the goal. Plain A* queues such a goal at its full length instead of taking the first one it meets, and BFS keeps
+the shortest one it met until the search has gone as deep without finding a shorter one. The cache holds at most `max_entries`
+states and evicts the least recently used ones; it lives for the whole session and can be saved to and loaded from
+a file. The solvers only use a cache once a program enables one (set_cache): the GUI does, and the solution
+precomputing CLI does with --cache, while library calls and batch runs search from scratch.
+"""
+import os
+from array import array
+from collections import OrderedDict
+from Move import Move
+from PackedState import SUITS, SUIT, COLUMN_STRIDE
+
+DEAD = -1  # Entry value of a state from which no solution exists
+MAX_ENTRIES = 1_000_000
+
+CACHE_MAGIC = b'FCSC2'  # Header of the cache files
+
+# Move Encoding -------------------------------------------------------------------------------------------------------------------------------
+
+# A move is encoded by its type, the (lowest) card it moves, the card it lands on for moves to a tableau column (NO_CARD
+# for an empty column or a move off the tableau) and its number of cards, none of which depend on where the columns and
+# free cells are. Only the moves the solvers generate are encoded: they never move cards out of the foundations.
+MOVE_TYPES = ["tableau_to_foundation", "tableau_to_freecell", "freecell_to_foundation", "tableau_to_tableau",
+              "freecell_to_tableau", "supermove"]
+SUPERMOVE = MOVE_TYPES.index("supermove")
+NO_CARD = 52
+MOVE_CODES = len(MOVE_TYPES) * 53 * 53 * 14  # Number of encode_move values
+
+
+def encode_move(state, move):
+    """Encodes a Move or (src, dest, num_cards) supermove, valid on a PackedState, as a position-independent int."""
+    if isinstance(move, tuple):
+        src, dest, num_cards = move
+        kind, card = SUPERMOVE, state.tableau[src][-num_cards]
+    else:
+        kind, dest, num_cards = MOVE_TYPES.index(move.move_type), move.destination, 1
+        card = state.tableau[move.source][-1] if move.move_type.startswith("tableau") else state.free_cells[move.source]
+    to_tableau = kind == SUPERMOVE or move.move_type.endswith("to_tableau")
+    target = state.tableau[dest][-1] if to_tableau and state.tableau[dest] else NO_CARD
+    return ((kind * 53 + card) * 53 + target) * 14 + num_cards
+
+def decode_move(state, code):
+    """Decodes an encode_move int into the Move or supermove tuple that does the same on a PackedState."""
+    code, num_cards = divmod(code, 14)
+    code, target = divmod(code, 53)
+    kind, card = divmod(code, 53)
+    move_type = MOVE_TYPES[kind]
+
+    if kind == SUPERMOVE or move_type.startswith("tableau"):
+        source = state.locations[card] // COLUMN_STRIDE
+    else:
+        source = state.free_cells.index(card)
+    if kind == SUPERMOVE or move_type.endswith("to_tableau"):
+        destination = state.tableau.index(b'') if target == NO_CARD else state.locations[target] // COLUMN_STRIDE
+    elif move_type.endswith("to_foundation"):
+        destination = SUITS[SUIT[card]]
+    else:
+        destination = None
+
+    if kind == SUPERMOVE:
+        return (source, destination, num_cards)
+    return Move(move_type, source, destination)
+
+
+# Solver Cache --------------------------------------------------------------------------------------------------------------------------------
+
+
+class SolverCache:
+    """
+    Bounded LRU map from canonical state hashes to DEAD or to (2 * distance + optimal) * MOVE_CODES + the encoded next
+    move, where `optimal` is 1 when the distance is proven to be the shortest one.
+    Solvers record the states along every solution they find (add_solution) and the states of every search that ran
+    out of states without one, having expanded each of them with every legal move (add_dead); they skip states known to
+    be dead and jump to the goal from states known to be solvable (shortcut).
+    """
+    def __init__(self, max_entries=MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path  # File the cache is loaded from and saved to, if any
+        self.entries = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, state):
+        """Returns the entry of a PackedState (DEAD or an encoded distance and move), or None if it isn't known."""
+        value = self.entries.get(state.canonical)
+        if value is not None:
+            self.entries.move_to_end(state.canonical)
+        return value
+
+    def put(self, key, value):
+        """Stores an entry, evicting the least recently used one when the cache is full."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def is_dead(self, state):
+        """Checks if a PackedState is known to have no solution."""
+        return self.get(state) == DEAD
+
+    def distance(self, state, optimal=False):
+        """
+        Returns the number of moves to the goal from a PackedState if it is known to be solvable, else None.
+        With `optimal`, only distances proven to be the shortest ones are returned.
+        """
+        value = self.get(state)
+        if value is None or value == DEAD or (optimal and not value // MOVE_CODES & 1):
+            return None
+        return value // MOVE_CODES >> 1
+
+    def next_move(self, state, optimal=False):
+        """Returns the next move of a known solution (a shortest one, with `optimal`) from a PackedState, or None."""
+        distance = self.distance(state, optimal)
+        if not distance:
+            return None
+        return decode_move(state, self.entries[state.canonical] % MOVE_CODES)
+
+    def add_solution(self, goal, optimal=False):
+        """
+        Records every state along the path of a solved search node, with its distance to the goal. With `optimal`, the
+        path is a shortest one, and so is the rest of it from every state along it.
+        """
+        node, distance = goal, 0
+        self.put(goal.canonical, 2 * MOVE_CODES)  # Distance 0 is always the shortest
+        while node.parent is not None:
+            parent, distance = node.parent, distance + 1
+            known = self.entries.get(parent.canonical)
+            if known is None or known == DEAD or (optimal, -distance) > _rank(known):
+                self.put(parent.canonical, (2 * distance + optimal) * MOVE_CODES + encode_move(parent, node.move))
+            node = parent
+
+    def add_dead(self, states):
+        """
+        Records states that were proven to have no solution: the states reached by a search that ran out of states,
+        where every one of them was expanded with all its legal moves.
+        """
+        for state in states:
+            self.put(state.canonical, DEAD)
+
+    def __contains__(self, state):
+        """Checks if a PackedState has an entry, without counting it as a use."""
+        return state.canonical in self.entries
+
+    def shortcut(self, state, optimal=False):
+        """
+        Follows the cached solution from a search node known to be solvable and returns the solved node at its end,
+        linked to `state` through its parents, or None if the state isn't known to be solvable or the cached path
+        is broken (evicted entries, hash collisions). With `optimal`, only a solution proven to be a shortest one is
+        followed.
+        """
+        distance = self.distance(state, optimal)
+        if distance is None:
+            return None
+        node = state
+        try:
+            for _ in range(distance):  # Every state of a cached solution is closer to the goal than the one before
+                if node.is_solved():
+                    break
+                move = self.next_move(node, optimal)
+                if move is None:
+                    return None
+                node = node.child(move)
+        except (ValueError, IndexError):  # The cached move doesn't fit the state
+            return None
+        return node if node.is_solved() else None
+
+    def clear(self):
+        """Forgets every entry."""
+        self.entries.clear()
+
+    def save(self, path=None):
+        """Writes the entries to a file (the cache's own file by default), least recently used first."""
+        path = path or self.path
+        keys = array('Q', self.entries.keys())
+        values = array('q', self.entries.values())
+        with open(path, 'wb') as file:
+            file.write(CACHE_MAGIC)
+            file.write(len(keys).to_bytes(8, 'little'))
+            keys.tofile(file)
+            values.tofile(file)
+
+    def load(self, path=None):
+        """Adds the entries of a file written by save(). Files of another format are ignored."""
+        path = path or self.path
+        with open(path, 'rb') as file:
+            if file.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return
+            count = int.from_bytes(file.read(8), 'little')
+            keys, values = array('Q'), array('q')
+            keys.fromfile(file, count)
+            values.fromfile(file, count)
+        for key, value in zip(keys, values):
+            self.put(key, value)
+
+
+def _rank(value):
+    """Orders solvable entries from worst to best: proven shortest distances first, then shorter ones."""
+    return value // MOVE_CODES & 1, -(value // MOVE_CODES >> 1)
+
+
+CACHE = None  # The cache of the solvers of this process, if any; off until a program enables it with set_cache
+
+
+def set_cache(cache):
+    """Sets (or clears, with None) the SolverCache that the solvers of this process use."""
+    global CACHE
+    CACHE = cache
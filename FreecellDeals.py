@@ -0,0 +1,85 @@
+import random
+from PackedState import PackedState, SUITS, EMPTY
+from FreecellState import FreecellState
+
+# Microsoft FreeCell Deals --------------------------------------------------------------------------------------------------------------------
+
+# Deal number n of Microsoft FreeCell is shuffled by the Microsoft C runtime rand() seeded with n. Its cards are
+# numbered rank-major, 4 * (rank - 1) + suit with suits in "CDHS" order, and are dealt row by row over the 8 columns.
+MS_SUITS = ['clubs', 'diamonds', 'hearts', 'spades']
+# Translation table (for bytes.translate) from Microsoft card numbers to PackedState ints
+MS_TO_PACKED = bytes(SUITS.index(MS_SUITS[c % 4]) * 13 + c // 4 if c < 52 else 0 for c in range(256))
+MAX_DEAL_NUMBER = 2 ** 31 - 1  # rand() keeps 31 bits of state, so larger numbers would repeat smaller deals
+
+EMPTY_FREE_CELLS = bytes([EMPTY] * 4)
+EMPTY_FOUNDATIONS = bytes(4)
+
+
+def ms_deal_order(number):
+    """Returns the 52 cards of Microsoft FreeCell deal `number` in the order they are dealt, as PackedState ints."""
+    if not 1 <= number <= MAX_DEAL_NUMBER:
+        raise ValueError(f"Deal numbers go from 1 to {MAX_DEAL_NUMBER}: {number}")
+    cards = bytearray(range(51, -1, -1))
+    seed = number
+    for i in range(52):
+        seed = (seed * 214013 + 2531011) & 0x7FFFFFFF
+        j = 51 - (seed >> 16) % (52 - i)
+        cards[i], cards[j] = cards[j], cards[i]
+    return cards.translate(MS_TO_PACKED)
+
+def deal_tableau(order):
+    """Deals 52 cards (bytes, in dealing order) row by row over the 8 columns, returning the packed tableau."""
+    order = bytes(order)
+    return tuple(order[i::8] for i in range(8))
+
+def ms_deal(number):
+    """Returns Microsoft FreeCell deal `number` as a PackedState."""
+    return PackedState(deal_tableau(ms_deal_order(number)), EMPTY_FREE_CELLS, EMPTY_FOUNDATIONS)
+
+def seeded_deal(seed):
+    """Returns the deal shuffled by random.Random(seed), as a PackedState. The same seed always gives the same deal."""
+    order = bytearray(range(52))
+    random.Random(seed).shuffle(order)
+    return PackedState(deal_tableau(order), EMPTY_FREE_CELLS, EMPTY_FOUNDATIONS)
+
+def iter_deals(numbers, microsoft=True):
+    """
+    Yields (number, PackedState) for every deal number (Microsoft numbering) or seed (see seeded_deal), one at a time,
+    so large deal sets never have to be held in memory. Use PackedState.to_state() for a FreecellState.
+    """
+    deal = ms_deal if microsoft else seeded_deal
+    for number in numbers:
+        yield number, deal(number)
+
+
+# Deal Lists ----------------------------------------------------------------------------------------------------------------------------------
+
+def parse_seeds(text):
+    """Parses a list of deal numbers or seeds such as "1-100,250,300-310"."""
+    seeds = []
+    for part in text.split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            seeds.extend(range(int(first), int(last) + 1))
+        elif part:
+            seeds.append(int(part))
+    return seeds
+
+def load_deals(deal_numbers=(), seeds=(), presets=(), saves=(), presets_file="presets.json"):
+    """
+    Returns (name, FreecellState) for every requested deal: Microsoft FreeCell deals by number, random deals by
+    seed, entries of the presets file by name or index, and saved-game files (all looked up in the saves folder,
+    like the GUI does).
+    """
+    deals = [(f"deal {number}", state.to_state()) for number, state in iter_deals(deal_numbers)]
+    deals += [(f"seed {seed}", state.to_state()) for seed, state in iter_deals(seeds, microsoft=False)]
+
+    if presets:
+        all_presets = FreecellState.load_presets(presets_file)
+        names = FreecellState.get_presets_name(all_presets)
+        for preset in presets:
+            index = int(preset) if preset.isdigit() else names.index(preset)
+            deals.append((names[index], FreecellState.create_from_preset(all_presets[index])))
+
+    deals += [(filename, FreecellState.load_from_file(filename)) for filename in saves]
+    return deals
@@ -1,5 +1,8 @@
 import re
+import sqlite3
 import time
+import queue
+import threading
 import tkinter as tk
 from tkinter import Button, PhotoImage
 from tkinter import *
@@ -7,19 +10,31 @@ import tkinter.messagebox as messagebox
 import tkinter
 from PIL import Image, ImageTk
 import FreecellMove as fcm
-from Card import Card
+from Card import Card, DECK
+import CardImages
 from Move import Move
-from FreecellAI import solve_game_astar, solve_game_bfs, solve_game_dfs, grid_search
+from FreecellAI import solve_game_astar, solve_game_anytime, solve_game_beam, solve_game_bfs, solve_game_dfs, solve_game_portfolio, grid_search
 from FreecellState import FreecellState
+from FreecellLog import SolverMonitor, SolverCancelled, set_monitor
+import FreecellSolutions
+import FreecellCache
+from PackedState import PackedState
 import random
 
+WEIGHTED_ASTAR_WEIGHT = 3.0  # Heuristic weight of the "Weighted A*" solver
+ANYTIME_TIME_LIMIT = 10.0  # Seconds the "Anytime A*" solver may search for shorter solutions
+BEAM_WIDTH = 500  # States kept per layer by the "Beam" solver (multiplied on each restart)
+SOLVER_POLL_INTERVAL = 100  # Milliseconds between two checks of a solver running in the background
+PLAYBACK_DELAY = 500  # Milliseconds between two moves when playing a solution back
+SUIT_GLYPHS = {"hearts": "♥", "diamonds": "♦", "clubs": "♣", "spades": "♠"}
+
 
 class FreeCellGUI:
     def __init__(self, root, game):
         self.root = root
         self.game = game
-        self.card_images = {}
         self.highlight_id = None
+        self.busy = False  # True while a solver runs or a solution is played back; the board ignores clicks
         # Load saved time instead of resetting it
         self.minutes = 0
         self.seconds = 0
@@ -45,6 +60,7 @@ class FreeCellGUI:
         self.selected = None
         self.button_ids = [] 
         self.setup_buttons()
+        self.setup_board()
 
         print(self.game.heuristic())
         fcm.apply_automatic_moves(self.game)
@@ -97,78 +113,95 @@ class FreeCellGUI:
 
       
     def load_card_image(self, card):
-        """Loads and resizes the card image."""
-        card_name = f"{card.rank}_of_{card.suit}.png"  # Ensure image filenames match this format
-        if card_name not in self.card_images:
-            image = Image.open(f"assets/cards/{card_name}")  # Adjust the path to your images
-            image = image.resize((60, 90), Image.LANCZOS)  # Resize to fit the card size
-            self.card_images[card_name] = ImageTk.PhotoImage(image)
-        return self.card_images[card_name]
+        """Returns the card image, shared with every other window (see CardImages)."""
+        return CardImages.card_image(self.root, card, CardImages.CARD_SIZE)
 
-    def draw_board(self):
-        """Draws the game board, including free cells, foundations, and tableau."""
-        for item in self.canvas.find_all():
-            if item not in self.button_ids:  # Prevent deletion of buttons and timer
-                self.canvas.delete(item)
-        # Re-add background image after clearing the canvas
-        self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
-
-        # Draw Free Cells
+    def setup_board(self):
+        """
+        Creates the canvas items of the board once: the free cell, foundation and tableau slots, and one image item per
+        card. Click handlers are bound here, once, and look up where the clicked card or slot currently is, so
+        draw_board only has to move the items that changed.
+        """
+        # Free Cells
         for i in range(4):
             x, y = 85 + i * 100, 50
             rect_id = self.canvas.create_rectangle(x, y, x+60, y+90, outline="white", width=2, fill="green")
-            
-            if self.game.free_cells[i]:
-                self.draw_card(self.game.free_cells[i], x, y, type="freecell", index=i, isCard=True)
-            else:
-                self.canvas.tag_bind(rect_id, "<Button-1>", lambda event, type="freecell", index=None, isCard=False: self.handle_click(type, index, isCard))
+            self.canvas.tag_bind(rect_id, "<Button-1>", lambda event, index=i: self.handle_slot_click("freecell", index))
 
-        # Draw Foundations
+        # Foundations
         for i, suit in enumerate(["hearts", "diamonds", "clubs", "spades"]):
             x, y = 485 + i * 100, 50
             rect_id = self.canvas.create_rectangle(x, y, x+60, y+90, outline="white", width=2, fill="green")
-            
-            match suit:
-                case "hearts":
-                    text_id = self.canvas.create_text(x+30, y+40, text=f"♥", font=("Arial", 35), fill="white")
-                case "diamonds":
-                    text_id = self.canvas.create_text(x+30, y+40, text=f"♦", font=("Arial", 35), fill="white")
-                case "clubs":
-                    text_id = self.canvas.create_text(x+30, y+40, text=f"♣", font=("Arial", 35), fill="white")
-                case "spades":
-                    text_id = self.canvas.create_text(x+30, y+40, text=f"♠", font=("Arial", 35), fill="white")
-
-            if self.game.foundations[suit]:
-                self.draw_card(Card(self.game.foundations[suit], suit), x, y, type="foundation", index=suit, isCard=True)
-            else:
-                self.canvas.tag_bind(rect_id, "<Button-1>", lambda event, type="foundation", index=suit, isCard=False: self.handle_click(type, index, isCard))
-                self.canvas.tag_bind(text_id, "<Button-1>", lambda event, type="foundation", index=suit, isCard=False: self.handle_click(type, index, isCard))
+            text_id = self.canvas.create_text(x+30, y+40, text=SUIT_GLYPHS[suit], font=("Arial", 35), fill="white")
+            for item in (rect_id, text_id):
+                self.canvas.tag_bind(item, "<Button-1>", lambda event, suit=suit: self.handle_slot_click("foundation", suit))
 
-        # Draw Tableau
-        for i, col in enumerate(self.game.tableau):  
+        # Tableau
+        for i in range(8):
             x, y = 85 + i * 100, 200
             rect_id = self.canvas.create_rectangle(x, y, x+60, y+300, outline="white", width=2, fill="green")
+            self.canvas.tag_bind(rect_id, "<Button-1>", lambda event, index=i: self.handle_slot_click("tableau", index))
 
-            for j, card in enumerate(col):  
-                self.draw_card(card, x, y + j * 30, type="tableau", index=i, isCard=True)
+        # Cards, hidden until draw_board places them
+        CardImages.preload(self.root, CardImages.CARD_SIZE)  # All 52 faces up front, so the first moves don't stutter
+        self.card_items = {}
+        self.card_places = {}  # Card -> (x, y, type, index) of every card currently shown
+        for card in DECK:
+            img_id = self.canvas.create_image(0, 0, image=self.load_card_image(card), anchor="center", state="hidden")
+            self.canvas.tag_bind(img_id, "<Button-1>", lambda event, card=card: self.handle_card_click(card))
+            self.card_items[card] = img_id
 
-            if not col:
-                self.canvas.tag_bind(rect_id, "<Button-1>", lambda event, type="tableau", index=i, isCard=False: self.handle_click(type, index, isCard))
+    def draw_board(self):
+        """
+        Brings the canvas up to date with the game state. Only the cards whose place changed are moved and raised
+        (lowest first, so the columns stack correctly), and cards that are no longer visible are hidden.
+        """
+        places = {}
+        for i, card in enumerate(self.game.free_cells):
+            if card:
+                places[card] = (85 + i * 100, 50, "freecell", i)
+        for i, suit in enumerate(["hearts", "diamonds", "clubs", "spades"]):
+            if self.game.foundations[suit]:
+                places[Card(self.game.foundations[suit], suit)] = (485 + i * 100, 50, "foundation", suit)
+        for i, col in enumerate(self.game.tableau):
+            for j, card in enumerate(col):
+                places[card] = (85 + i * 100, 200 + j * 30, "tableau", i)
 
-    def draw_card(self, card, x, y, type, index, isCard):
-        """Draws a card at the specified position."""
-        image = self.load_card_image(card)
-        img_id = self.canvas.create_image(x + 30, y + 45, image=image, anchor="center")  # Center the image
+        # Cards covered on a foundation
+        for card in self.card_places.keys() - places.keys():
+            self.canvas.itemconfigure(self.card_items[card], state="hidden")
+            del self.card_places[card]
 
-        # Bind click event to the card
-        self.canvas.tag_bind(img_id, "<Button-1>", lambda event: self.handle_click(type, index, isCard))
+        for card, place in places.items():
+            if self.card_places.get(card) != place:
+                img_id = self.card_items[card]
+                self.canvas.coords(img_id, place[0] + 30, place[1] + 45)  # Center the image
+                self.canvas.itemconfigure(img_id, state="normal")
+                self.canvas.tag_raise(img_id)
+                self.card_places[card] = place
 
 
 # Interaction Methods -----------------------------------------------------------------------------------------------------------------------------------------
 
 
+    def handle_card_click(self, card):
+        """Handles a click on a card, wherever the card currently is."""
+        x, y, type, index = self.card_places[card]
+        self.handle_click(type, index, True)
+
+    def handle_slot_click(self, type, index):
+        """Handles a click on a slot; it only counts when the slot is empty, like a click on an empty free cell, foundation or column."""
+        if type == "freecell" and self.game.free_cells[index] is None:
+            self.handle_click(type, None, False)
+        elif type == "foundation" and not self.game.foundations[index]:
+            self.handle_click(type, index, False)
+        elif type == "tableau" and not self.game.tableau[index]:
+            self.handle_click(type, index, False)
+
     def handle_click(self, type, index, isCard):
         """Handles click events on cards and empty slots."""
+        if self.busy:
+            return
 
         if self.selected != None and self.selected[0] == "freecell" and type == "freecell":
             print("Freecell to Freecell move is irrelevant.")
@@ -261,27 +294,37 @@ class FreeCellGUI:
 
     def hint_move(self):
         """
-        Provides a hint to the player by suggesting a random valid move based on the current game state.
-        Displays the hint in a message box or informs if no moves are available.
+        Provides a hint to the player: the next move of a known solution if the solver cache has one for the current
+        state, else a random valid move. Displays the hint in a message box or informs if no moves are available.
+        Ignored while a solver runs, since the solver thread writes to the cache.
         """
-        #get possible free moves for the current state 
-        possible_moves = FreecellState.get_possible_moves(self.game)
-        if not possible_moves:
-            tkinter.messagebox.showinfo("Hint", "No available moves at the moment.")
+        if self.busy:
             return
-        #print(possible_moves)
-        list_size = len(possible_moves)
-        random_index = random.randrange(1, list_size)
-        #get ramdon move
-        hint_move = possible_moves[random_index]
+        cache = FreecellCache.CACHE
+        hint_move = cache.next_move(PackedState.from_state(self.game)) if cache is not None else None
+        if isinstance(hint_move, tuple):
+            src, dest, num_cards = hint_move
+            tkinter.messagebox.showinfo("Hint", f"Move {num_cards} cards from Tableau {src} to Tableau {dest}.")
+            return
+        if hint_move is None:
+            #get possible free moves for the current state 
+            possible_moves = FreecellState.get_possible_moves(self.game)
+            if not possible_moves:
+                tkinter.messagebox.showinfo("Hint", "No available moves at the moment.")
+                return
+            #print(possible_moves)
+            list_size = len(possible_moves)
+            random_index = random.randrange(1, list_size)
+            #get ramdon move
+            hint_move = possible_moves[random_index]
         move_type = hint_move.move_type
 
         if move_type == "tableau_to_foundation":
-            hint_msg = f"Move a card from Tableau {hint_move.source} to Foundation {hint_move.suit}."
+            hint_msg = f"Move a card from Tableau {hint_move.source} to Foundation {hint_move.destination}."
         elif move_type == "tableau_to_freecell":
             hint_msg = f"Move a card from Tableau {hint_move.source} to a Freecell."
         elif move_type == "freecell_to_foundation":
-            hint_msg = f"Move a card from Freecell {hint_move.source} to Foundation {hint_move.suit}."
+            hint_msg = f"Move a card from Freecell {hint_move.source} to Foundation {hint_move.destination}."
         elif move_type == "tableau_to_tableau":
             hint_msg = f"Move a card from Tableau {hint_move.source} to Tableau {hint_move.destination}."
         elif move_type == "freecell_to_tableau":
@@ -297,6 +340,8 @@ class FreeCellGUI:
 
     def undo_move(self):
         """Undoes the last move and redraws the board."""
+        if self.busy:
+            return
         self.game.undo()
         self.draw_board()
         print("Undo")
@@ -314,21 +359,32 @@ class FreeCellGUI:
     
     def solve_game(self):
         """
-        Displays options for solving the game using different algorithms (A*, BFS, DFS) 
+        Displays options for solving the game using different algorithms (A*, weighted A*, anytime A*, beam search, BFS, DFS,
+        or a portfolio racing several of them) 
         and creates corresponding buttons on the GUI.
         """
+        if self.busy:
+            return
         self.title_id = self.canvas.create_text(450, 610, text="Choose an algorithm to solve the game", font=("Helvetica", 15), fill="white")
     
         self.solve_button_tester = Button(self.root, text="tester", command=self.solve_game_tester)
         self.solve_button_AI = Button(self.root, text="A*", command=self.solve_game_AI)
+        self.solve_button_weighted = Button(self.root, text="Weighted A*", command=self.solve_game_weighted)
+        self.solve_button_anytime = Button(self.root, text="Anytime A*", command=self.solve_game_anytime)
+        self.solve_button_beam = Button(self.root, text="Beam", command=self.solve_game_beam)
         self.solve_button_BFS = Button(self.root, text="BFS", command=self.solve_game_bfs)
         self.solve_button_DFS = Button(self.root, text="DFS", command=self.solve_game_dfs)
+        self.solve_button_portfolio = Button(self.root, text="Portfolio", command=self.solve_game_portfolio)
 
         # Store canvas windows IDs
-        self.solve_button_tester_id = self.canvas.create_window(100, 650, window=self.solve_button_tester, width=110, height=35)
-        self.solve_button_AI_id = self.canvas.create_window(280, 650, window=self.solve_button_AI, width=110, height=35)
-        self.solve_button_BFS_id = self.canvas.create_window(430, 650, window=self.solve_button_BFS, width=110, height=35)
-        self.solve_button_DFS_id = self.canvas.create_window(580, 650, window=self.solve_button_DFS, width=110, height=35)
+        self.solve_button_tester_id = self.canvas.create_window(65, 650, window=self.solve_button_tester, width=105, height=35)
+        self.solve_button_AI_id = self.canvas.create_window(182, 650, window=self.solve_button_AI, width=105, height=35)
+        self.solve_button_weighted_id = self.canvas.create_window(299, 650, window=self.solve_button_weighted, width=105, height=35)
+        self.solve_button_anytime_id = self.canvas.create_window(416, 650, window=self.solve_button_anytime, width=105, height=35)
+        self.solve_button_beam_id = self.canvas.create_window(533, 650, window=self.solve_button_beam, width=105, height=35)
+        self.solve_button_BFS_id = self.canvas.create_window(650, 650, window=self.solve_button_BFS, width=105, height=35)
+        self.solve_button_DFS_id = self.canvas.create_window(767, 650, window=self.solve_button_DFS, width=105, height=35)
+        self.solve_button_portfolio_id = self.canvas.create_window(884, 650, window=self.solve_button_portfolio, width=105, height=35)
 
     def solve_game_tester(self):
         if self.hide_solver_ui():
@@ -341,6 +397,27 @@ class FreeCellGUI:
         if self.hide_solver_ui():
             self.root.after(100, self.solve_game_AI_2)
 
+    def solve_game_weighted(self):
+        """
+        Initiates the weighted A* solution process, which trades solution length for speed.
+        """
+        if self.hide_solver_ui():
+            self.root.after(100, self.solve_game_weighted_2)
+
+    def solve_game_anytime(self):
+        """
+        Initiates the anytime A* solution process, which returns the best solution found within a time budget.
+        """
+        if self.hide_solver_ui():
+            self.root.after(100, self.solve_game_anytime_2)
+
+    def solve_game_beam(self):
+        """
+        Initiates the beam search solution process, whose cost is bounded by the beam width.
+        """
+        if self.hide_solver_ui():
+            self.root.after(100, self.solve_game_beam_2)
+
     def solve_game_bfs(self):
         """
         Initiates the process of solving the Freecell game using the BFS algorithm, 
@@ -375,84 +452,177 @@ class FreeCellGUI:
         Solves the current Freecell game using the A* algorithm and visualizes the solution step-by-step.
         If a solution is found, applies the moves and updates the game state; otherwise, notifies the user.
         """
-        result = solve_game_astar(self.game)
-        if result is not None:
-            print("Game solved by A Star!")
-            for move in result:
-                if isinstance(move, str) and move.startswith("Supermove"):  # Supermove string
-                    # Parse and extract the details from the string
-                    match = re.match(r"Supermove\(source=(\d+), destination=(\d+), number of cards=(\d+)\)", move)
-                    if match:
-                        src = int(match.group(1))
-                        dest = int(match.group(2))
-                        num_cards = int(match.group(3))
-                        self.game = fcm.execute_supermove(self.game, src, dest, num_cards)
-                else:  # Regular atomic move
-                    self.game = self.game.apply_move(move)
-                    
-                self.game = fcm.apply_automatic_moves(self.game)
-                self.draw_board()
-                self.root.update_idletasks()
-                time.sleep(0.5)  # Add a delay to visualize the moves
-            self.winning_state()  # Call the method to remove buttons and display message
-        else:
-            print("A Star could not solve the game.")
+        self.start_solver("A Star", solve_game_astar)
+
+    def solve_game_weighted_2(self):
+        """
+        Solves the current Freecell game using weighted A* and visualizes the solution step-by-step.
+        """
+        self.start_solver("Weighted A Star", solve_game_astar, weight=WEIGHTED_ASTAR_WEIGHT)
+
+    def solve_game_anytime_2(self):
+        """
+        Solves the current Freecell game using anytime A* within ANYTIME_TIME_LIMIT seconds and visualizes the
+        shortest solution found step-by-step.
+        """
+        self.start_solver("Anytime A Star", solve_game_anytime, time_limit=ANYTIME_TIME_LIMIT)
+
+    def solve_game_beam_2(self):
+        """
+        Solves the current Freecell game using beam search and visualizes the solution step-by-step.
+        """
+        self.start_solver("Beam Search", solve_game_beam, width=BEAM_WIDTH)
 
     def solve_game_bfs_2(self):
         """
         Solves the current Freecell game using a BFS algorithm and visualizes the solution step-by-step.
         Applies moves to the game state, updates the GUI, and handles the winning state if solved.
         """
-        result = solve_game_bfs(self.game)
-        if result is not None:
-            print("Game solved by BFS!")
-            for move in result:
-                if isinstance(move, str) and move.startswith("Supermove"):  # Supermove string
-                    # Parse and extract the details from the string
-                    match = re.match(r"Supermove\(source=(\d+), destination=(\d+), number of cards=(\d+)\)", move)
-                    if match:
-                        src = int(match.group(1))
-                        dest = int(match.group(2))
-                        num_cards = int(match.group(3))
-                        self.game = fcm.execute_supermove(self.game, src, dest, num_cards)
-                else:  # Regular atomic move
-                    self.game = self.game.apply_move(move)
-                    
-                self.game = fcm.apply_automatic_moves(self.game)
-                self.draw_board()
-                self.root.update_idletasks()
-                time.sleep(0.5)  # Add a delay to visualize the moves
-            self.winning_state()  # Call the method to remove buttons and display message
-        else:
-            print("BFS could not solve the game.")
+        self.start_solver("BFS", solve_game_bfs)
 
     def solve_game_dfs_2(self):
         """
         Solves the current Freecell game using a depth-first search (DFS) approach, animating the solution process step-by-step.
         """
-        result = solve_game_dfs(self.game)
+        self.start_solver("DFS", solve_game_dfs)
+    
+    def start_solver(self, name, solver, **kwargs):
+        """
+        Runs a solver on a copy of the game in a background thread, so the window stays responsive. Shows a progress
+        readout and a Cancel button, and polls the solver's update queue with root.after until it finishes.
+        Games already in the solution database are played back right away instead.
+        """
+        try:
+            solution = FreecellSolutions.lookup(self.game)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Could not read the solution database: {e}")
+            solution = None
+        if solution is not None:
+            print(f"{name}: solution found in the solution database.")
+            self.play_solution(solution, name)
+            return
+
+        self.busy = True
+        self.solver_name = name
+        self.solver_game = self.game.copy()
+        self.solver_start = time.time()
+        self.solver_progress = ""
+        self.solver_updates = queue.Queue()
+        self.solver_monitor = SolverMonitor(self.solver_updates)
+
+        self.progress_id = self.canvas.create_text(450, 610, text=f"{name}: solving...", font=("Helvetica", 15), fill="white")
+        self.cancel_button = Button(self.root, text="Cancel", command=self.cancel_solver)
+        self.cancel_button_id = self.canvas.create_window(450, 650, window=self.cancel_button, width=110, height=35)
+
+        set_monitor(self.solver_monitor)
+        threading.Thread(target=self.run_solver, args=(solver, self.game.copy(), kwargs, self.solver_updates), daemon=True).start()
+        self.root.after(SOLVER_POLL_INTERVAL, self.poll_solver)
+
+    @staticmethod
+    def run_solver(solver, game, kwargs, updates):
+        """Runs a solver (on the background thread) and puts its outcome on the update queue."""
+        try:
+            updates.put(('done', solver(game, **kwargs)))
+        except SolverCancelled:
+            updates.put(('cancelled',))
+        except Exception as e:
+            updates.put(('error', e))
+
+    def poll_solver(self):
+        """Shows the latest progress of the background solver, and plays its solution back once it finishes."""
+        outcome = None
+        try:
+            while True:
+                update = self.solver_updates.get_nowait()
+                if update[0] == 'progress':
+                    _, _, expanded, frontier_size, _ = update
+                    self.solver_progress = f"expanded: {expanded}, frontier: {frontier_size}, "
+                else:
+                    outcome = update
+        except queue.Empty:
+            pass
+
+        if outcome is None:
+            elapsed = time.time() - self.solver_start
+            if not self.solver_monitor.cancelled.is_set():
+                self.canvas.itemconfig(self.progress_id, text=f"{self.solver_name}: {self.solver_progress}elapsed: {elapsed:.1f}s")
+            self.root.after(SOLVER_POLL_INTERVAL, self.poll_solver)
+            return
+
+        set_monitor(None)
+        self.cancel_button.destroy()
+        self.canvas.delete(self.progress_id)
+        self.canvas.delete(self.cancel_button_id)
+
+        if outcome[0] == 'done':
+            if outcome[1] is not None:
+                try:
+                    FreecellSolutions.store(self.solver_game, outcome[1], self.solver_name)
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Could not save the solution: {e}")
+            self.play_solution(outcome[1], self.solver_name)
+        else:
+            if outcome[0] == 'cancelled':
+                print(f"{self.solver_name} was cancelled.")
+            else:
+                print(f"{self.solver_name} failed: {outcome[1]}")
+            self.busy = False
+
+    def cancel_solver(self):
+        """Asks the background solver to stop; it is cleaned up by poll_solver once it has stopped."""
+        self.solver_monitor.cancel()
+        self.canvas.itemconfig(self.progress_id, text=f"{self.solver_name}: cancelling...")
+
+    def play_solution(self, result, name):
+        """
+        Plays a solver's solution back, applying one move every PLAYBACK_DELAY milliseconds with root.after so the
+        window stays responsive, then handles the winning state. Notifies the user if the solver found no solution.
+        """
         if result is not None:
-            print("Game solved by DFS!")
-            for move in result:
-                if isinstance(move, str) and move.startswith("Supermove"):  # Supermove string
-                    # Parse and extract the details from the string
-                    match = re.match(r"Supermove\(source=(\d+), destination=(\d+), number of cards=(\d+)\)", move)
-                    if match:
-                        src = int(match.group(1))
-                        dest = int(match.group(2))
-                        num_cards = int(match.group(3))
-                        self.game = fcm.execute_supermove(self.game, src, dest, num_cards)
-                else:  # Regular atomic move
-                    self.game = self.game.apply_move(move)
-                    
-                self.game = fcm.apply_automatic_moves(self.game)
-                self.draw_board()
-                self.root.update_idletasks()
-                time.sleep(0.5)  # Add a delay to visualize the moves
-            self.winning_state()  # Call the method to remove buttons and display message
+            print(f"Game solved by {name}!")
+            self.busy = True
+            self.playback = iter(result)
+            self.root.after(PLAYBACK_DELAY, self.play_next_move)
         else:
-            print("DFS could not solve the game.")
-    
+            print(f"{name} could not solve the game.")
+            self.busy = False
+
+    def play_next_move(self):
+        """Applies the next move of the solution being played back and schedules the one after it."""
+        move = next(self.playback, None)
+        if move is None:
+            self.busy = False
+            self.winning_state()  # Call the method to remove buttons and display message
+            return
+
+        if isinstance(move, str) and move.startswith("Supermove"):  # Supermove string
+            # Parse and extract the details from the string
+            match = re.match(r"Supermove\(source=(\d+), destination=(\d+), number of cards=(\d+)\)", move)
+            if match:
+                src = int(match.group(1))
+                dest = int(match.group(2))
+                num_cards = int(match.group(3))
+                self.game = self.game.apply_supermove(src, dest, num_cards)
+        else:  # Regular atomic move
+            self.game = self.game.apply_move(move)
+
+        self.game = fcm.apply_automatic_moves(self.game)
+        self.draw_board()
+        self.root.after(PLAYBACK_DELAY, self.play_next_move)
+
+    def solve_game_portfolio(self):
+        """
+        Initiates the portfolio solution process, which races several solvers and keeps the first solution.
+        """
+        if self.hide_solver_ui():
+            self.root.after(100, self.solve_game_portfolio_2)
+
+    def solve_game_portfolio_2(self):
+        """
+        Solves the current Freecell game by racing several solvers in parallel and visualizes the first solution found.
+        """
+        self.start_solver("Portfolio", solve_game_portfolio)
+
     def hide_solver_ui(self):
         """
         Hides the solver UI elements by removing buttons and canvas items. 
@@ -461,13 +631,21 @@ class FreeCellGUI:
         try:
             self.solve_button_tester.destroy()
             self.solve_button_AI.destroy()
+            self.solve_button_weighted.destroy()
+            self.solve_button_anytime.destroy()
+            self.solve_button_beam.destroy()
             self.solve_button_BFS.destroy()
             self.solve_button_DFS.destroy()
+            self.solve_button_portfolio.destroy()
 
             self.canvas.delete(self.solve_button_tester_id)
             self.canvas.delete(self.solve_button_AI_id)
+            self.canvas.delete(self.solve_button_weighted_id)
+            self.canvas.delete(self.solve_button_anytime_id)
+            self.canvas.delete(self.solve_button_beam_id)
             self.canvas.delete(self.solve_button_BFS_id)
             self.canvas.delete(self.solve_button_DFS_id)
+            self.canvas.delete(self.solve_button_portfolio_id)
             self.canvas.delete(self.title_id)
 
             return True  # All deletions succeeded
@@ -0,0 +1,318 @@
+import atexit
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource  # Unix only: peak memory readings
+except ImportError:
+    resource = None
+
+# Log Levels ----------------------------------------------------------------------------------------------------------------------------------
+
+# QUIET: nothing, INFO: solver results and summaries, DEBUG: periodic solver progress and moves, TRACE: per-call details
+QUIET, INFO, DEBUG, TRACE = 0, 1, 2, 3
+LEVEL_NAMES = {'quiet': QUIET, 'info': INFO, 'debug': DEBUG, 'trace': TRACE}
+
+# The level can be set with the FREECELL_LOG environment variable (quiet, info, debug or trace)
+LEVEL = LEVEL_NAMES.get(os.environ.get('FREECELL_LOG', 'info').lower(), INFO)
+
+SAMPLE_INTERVAL = 1.0  # Seconds between two progress samples of a running solver
+
+LAST_STATS = None  # SolverStats of the most recent solver run started in this process
+
+
+def set_level(level):
+    """Sets the global log level, given as a number or a level name."""
+    global LEVEL
+    LEVEL = LEVEL_NAMES[level.lower()] if isinstance(level, str) else level
+
+def enabled(level):
+    """Check if messages of the given level are logged. Guard expensive messages with it."""
+    return LEVEL >= level
+
+def log(level, message):
+    """Prints a message if its level is enabled."""
+    if LEVEL >= level:
+        print(message)
+
+
+# Solver Statistics ---------------------------------------------------------------------------------------------------------------------------
+
+
+class SolverStats:
+    """
+    Counters for a single solver run. The solver loops only increment plain attributes and call tick() once per
+    expansion; tick() is a single comparison until the next sample is due, so the counters cost next to nothing
+    when progress logging is disabled. Samples are taken every SAMPLE_INTERVAL seconds and logged at DEBUG level.
+    """
+    __slots__ = ('name', 'expanded', 'generated', 'duplicates', 'heuristic_calls', 'frontier_high_water',
+                 'start_time', 'next_check', 'last_sample', 'profiler')
+
+    CHECK_EVERY = 256  # Expansions between two clock reads
+
+    def __init__(self, name):
+        global LAST_STATS
+        LAST_STATS = self
+        self.name = name
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.heuristic_calls = 0
+        self.frontier_high_water = 0
+        self.start_time = time.time()
+        self.last_sample = self.start_time
+        self.profiler = PROFILER  # The solver loops time their phases with it when it isn't None
+        if PROFILER is not None:
+            PROFILER.start(name)
+        checks = LEVEL >= DEBUG or MONITOR is not None or PROFILER is not None
+        self.next_check = self.CHECK_EVERY if checks else float('inf')
+
+    def tick(self, frontier_size):
+        """
+        Counts one expansion and records the frontier size, taking a progress sample when one is due.
+        Raises SolverCancelled if the active SolverMonitor was cancelled.
+        """
+        self.expanded += 1
+        if frontier_size > self.frontier_high_water:
+            self.frontier_high_water = frontier_size
+        if self.expanded >= self.next_check:
+            self.next_check = self.expanded + self.CHECK_EVERY
+            if MONITOR is not None:
+                MONITOR.sample(self, frontier_size)
+            if self.profiler is not None:
+                self.profiler.sample(self)
+            now = time.time()
+            if LEVEL >= DEBUG and now - self.last_sample >= SAMPLE_INTERVAL:
+                self.last_sample = now
+                log(DEBUG, f"[{self.name}] {self.progress(frontier_size)}")
+
+    def elapsed(self):
+        """Seconds since the solver started."""
+        return time.time() - self.start_time
+
+    def rate(self):
+        """Expansions per second so far."""
+        elapsed = self.elapsed()
+        return self.expanded / elapsed if elapsed > 0 else 0.0
+
+    def progress(self, frontier_size):
+        """Returns a one-line progress readout."""
+        return (f"expanded: {self.expanded}, frontier: {frontier_size}, "
+                f"expansions/sec: {self.rate():.0f}, elapsed: {self.elapsed():.1f}s")
+
+    def summary(self):
+        """Returns the counters as a dictionary."""
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'heuristic_calls': self.heuristic_calls,
+            'frontier_high_water': self.frontier_high_water,
+            'expansions_per_sec': round(self.rate(), 1),
+            'elapsed': round(self.elapsed(), 4),
+        }
+
+    def report(self):
+        """Logs the final counters at INFO level, and the profile of the run if it was profiled."""
+        log(INFO, f"[{self.name}] expanded: {self.expanded}, generated: {self.generated}, "
+                  f"duplicates: {self.duplicates}, heuristic calls: {self.heuristic_calls}, "
+                  f"frontier high-water: {self.frontier_high_water}, expansions/sec: {self.rate():.0f}")
+        if self.profiler is not None:
+            self.profiler.finish(self)
+
+
+# Memory Usage --------------------------------------------------------------------------------------------------------------------------------
+
+
+def peak_memory_mb():
+    """
+    Peak resident memory of the current process in MB, or None where it can't be read. It is read from the OS, so
+    unlike tracemalloc it costs nothing while the search runs, but it covers the whole process and never goes down.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 2)  # Bytes on macOS, KB elsewhere
+
+def format_memory(megabytes):
+    """Formats a peak_memory_mb() reading for the logs."""
+    return f"{megabytes:.4f} MB" if megabytes is not None else "unavailable"
+
+
+# Solver Monitoring ---------------------------------------------------------------------------------------------------------------------------
+
+
+class SolverCancelled(Exception):
+    """Raised inside a running solver when its SolverMonitor is cancelled."""
+
+
+class SolverMonitor:
+    """
+    Lets another thread follow and stop the solver running in this process. While a monitor is active (see
+    set_monitor), every SolverStats.tick() check puts ('progress', name, expanded, frontier size, elapsed seconds)
+    samples on the `updates` queue, at most once per `interval` seconds, and raises SolverCancelled once cancel()
+    was called. Solvers that wait on other processes call check_cancelled() instead.
+    """
+    def __init__(self, updates, interval=0.2):
+        self.updates = updates
+        self.interval = interval
+        self.cancelled = threading.Event()
+        self.last_update = 0.0
+
+    def cancel(self):
+        """Asks the monitored solver to stop at its next check."""
+        self.cancelled.set()
+
+    def check(self):
+        """Raises SolverCancelled if the monitor was cancelled."""
+        if self.cancelled.is_set():
+            raise SolverCancelled()
+
+    def sample(self, stats, frontier_size):
+        """Checks for cancellation and sends a progress sample if one is due."""
+        self.check()
+        now = time.time()
+        if now - self.last_update >= self.interval:
+            self.last_update = now
+            self.updates.put(('progress', stats.name, stats.expanded, frontier_size, stats.elapsed()))
+
+
+MONITOR = None  # The active SolverMonitor, if any
+
+
+def set_monitor(monitor):
+    """Sets (or clears, with None) the SolverMonitor that the solvers of this process report to."""
+    global MONITOR
+    MONITOR = monitor
+
+def check_cancelled():
+    """Raises SolverCancelled if the active SolverMonitor was cancelled."""
+    if MONITOR is not None:
+        MONITOR.check()
+
+
+# Profiling -----------------------------------------------------------------------------------------------------------------------------------
+
+# Phases of a node expansion timed by the Profiler: taking the node off the frontier, generating its moves, applying
+# a move, applying the automatic moves that follow, hashing and duplicate detection, the heuristic and pushing the
+# child on the frontier
+PHASES = ('pop', 'moves', 'apply', 'automatic', 'dedup', 'heuristic', 'push')
+POP, MOVES, APPLY, AUTOMATIC, DEDUP, HEURISTIC, PUSH = range(len(PHASES))
+
+
+class Profiler:
+    """
+    Opt-in per-phase timing of the solver loops. While a profiler is active (see set_profiler), the solvers call
+    lap(phase) at the end of every phase of an expansion, which charges the time since the previous lap to that
+    phase, and build children through child() so that a move and the automatic moves that follow are timed apart.
+    The totals of every run can be exported as folded stacks for flame graphs (see write_folded).
+    Memory tracing is sampled: every `memory_every` progress checks, tracemalloc runs for a single check period
+    (SolverStats.CHECK_EVERY expansions), and the memory allocated per expansion in that window is recorded. The
+    rest of the search runs untraced. Use memory_every=0 to turn the memory samples off.
+    """
+    def __init__(self, memory_every=16):
+        self.memory_every = memory_every
+        self.runs = []  # (solver name, seconds per phase, memory samples) of every profiled run
+        self.totals = [0.0] * len(PHASES)
+        self.memory = []  # (expanded, bytes allocated per expansion, peak bytes) per traced window
+        self.checks = 0
+        self.window_start = None  # Expansions when the current tracemalloc window started, None when not tracing
+        self.last = time.perf_counter()
+
+    def start(self, name):
+        """Starts profiling a solver run."""
+        self.totals = [0.0] * len(PHASES)
+        self.memory = []
+        self.runs.append((name, self.totals, self.memory))
+        self.checks = 0
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        """Charges the time since the previous lap to `phase`."""
+        now = time.perf_counter()
+        self.totals[phase] += now - self.last
+        self.last = now
+
+    def child(self, state, move):
+        """Same as state.child(move), timing the move and the automatic moves as separate phases."""
+        new_state = state.execute_supermove(*move) if isinstance(move, tuple) else state.apply_move(move)
+        self.lap(APPLY)
+        new_state = new_state.apply_automatic_moves()
+        self.lap(AUTOMATIC)
+        new_state.parent = state
+        new_state.move = move
+        return new_state
+
+    def sample(self, stats):
+        """Called on every progress check: opens or closes a memory tracing window."""
+        self.checks += 1
+        if self.window_start is not None:
+            self.stop_tracing(stats)
+        elif self.memory_every and self.checks % self.memory_every == 0 and not tracemalloc.is_tracing():
+            self.window_start = stats.expanded
+            tracemalloc.start()
+        self.last = time.perf_counter()  # The profiler's own work isn't charged to any phase
+
+    def stop_tracing(self, stats):
+        """Closes the current memory tracing window and records its sample."""
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        expansions = max(1, stats.expanded - self.window_start)
+        self.memory.append((stats.expanded, current / expansions, peak))
+        self.window_start = None
+
+    def finish(self, stats):
+        """Ends a solver run and logs its profile at INFO level."""
+        if self.window_start is not None:
+            self.stop_tracing(stats)
+        log(INFO, f"[{stats.name}] {self.summary(self.totals, self.memory)}")
+
+    @staticmethod
+    def summary(totals, memory):
+        """Returns a one-line readout of the phase times and memory samples of a run."""
+        total = sum(totals) or 1.0
+        line = ", ".join(f"{phase} {seconds:.3f}s ({seconds / total:.0%})" for phase, seconds in zip(PHASES, totals))
+        if memory:
+            per_expansion = sum(sample[1] for sample in memory) / len(memory)
+            line += f", memory: {per_expansion / 1024:.1f} KB/expansion over {len(memory)} samples"
+        return line
+
+    def folded(self):
+        """
+        Returns the phase times of every run in the folded-stack format ("solver;phase microseconds" per line) read by
+        flamegraph.pl, speedscope and most flame graph viewers. Runs of the same solver are added up.
+        """
+        stacks = {}
+        for name, totals, _ in self.runs:
+            for phase, seconds in zip(PHASES, totals):
+                stack = f"{name.replace(';', ',')};{phase}"
+                stacks[stack] = stacks.get(stack, 0) + seconds
+        return "".join(f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in stacks.items() if seconds > 0)
+
+    def write_folded(self, path):
+        """Writes folded() to a file."""
+        with open(path, 'w') as file:
+            file.write(self.folded())
+
+
+PROFILER = None  # The active Profiler, if any
+
+
+def set_profiler(profiler):
+    """Sets (or clears, with None) the Profiler that the solvers started from now on in this process report to."""
+    global PROFILER
+    PROFILER = profiler
+
+def _write_profile():
+    """Writes the folded stacks of the active profiler to the FREECELL_PROFILE file."""
+    if PROFILER is not None:
+        PROFILER.write_folded(os.environ['FREECELL_PROFILE'])
+
+# Setting FREECELL_PROFILE to a file name profiles every solver run of the process and writes the folded stacks
+# to that file at exit
+if os.environ.get('FREECELL_PROFILE'):
+    set_profiler(Profiler())
+    atexit.register(_write_profile)
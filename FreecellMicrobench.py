@@ -0,0 +1,214 @@
+"""
+Micro-benchmarks of the primitives every expanded node goes through: state copies, hashing and equality, the
+heuristic, move generation, automatic moves and each move executor, for both FreecellState and PackedState.
+
+    python FreecellMicrobench.py
+    python FreecellMicrobench.py --filter packed --repeat 10 --corpus-size 1000
+
+The states come from actual solver runs: weighted A* solves every deal of the corpus, and the states along each
+solution path and their children (the states the solver generated around the path) are sampled. Every primitive
+reports ns/op (best of --repeat passes over the corpus), bytes/op (peak memory allocated during the call, from
+tracemalloc) and blocks/op (memory blocks still allocated after the call, i.e. the objects it returns).
+"""
+import argparse
+import gc
+import random
+import re
+import sys
+import time
+import tracemalloc
+import FreecellAI as ai
+import FreecellMove as fcm
+from FreecellDeals import ms_deal
+from FreecellLog import set_level, QUIET
+from FreecellState import FreecellState
+from PackedState import PackedState
+
+CORPUS_PRESETS = [0, 1, 2, 3]  # Entries of saves/presets.json
+CORPUS_DEALS = [1, 2, 3]  # Microsoft FreeCell deal numbers
+CORPUS_SIZE = 500  # States sampled from the solver runs
+CORPUS_WEIGHT = 3.0  # Weighted A* finds these deals' solutions in a few seconds
+REPEAT = 5
+
+SUPERMOVE = re.compile(r"Supermove\(source=(\d+), destination=(\d+), number of cards=(\d+)\)")
+
+
+# Corpus --------------------------------------------------------------------------------------------------------------------------------------
+
+
+def solver_states(game, weight=CORPUS_WEIGHT):
+    """
+    Solves a deal with weighted A* and returns the PackedStates along the solution path together with their
+    children, in the order the solver would reach them.
+    """
+    path = ai.solve_game_astar(game, weight=weight) or []
+    state = PackedState.from_state(game).apply_automatic_moves()
+    states = [state]
+    for move in path:
+        states += [state.child(m) for m in state.get_possible_moves_Astar(state.parent) + state.get_possible_supermoves()]
+        match = SUPERMOVE.match(move) if isinstance(move, str) else None
+        state = state.child(tuple(int(n) for n in match.groups()) if match else move)
+        states.append(state)
+    return states
+
+def build_corpus(size=CORPUS_SIZE, presets=CORPUS_PRESETS, deals=CORPUS_DEALS, seed=0):
+    """Returns `size` unsolved mid-game PackedStates sampled (with a fixed seed) from solver runs over the deals."""
+    games = [ms_deal(number).to_state() for number in deals]
+    all_presets = FreecellState.load_presets("presets.json")
+    games += [FreecellState.create_from_preset(all_presets[index]) for index in presets]
+
+    states = [state for game in games for state in solver_states(game) if not state.is_solved()]
+    if len(states) > size:
+        states = random.Random(seed).sample(states, size)
+    for state in states:
+        state.parent = None  # The samples stand alone; this also lets the rest of each search tree be freed
+    return states
+
+
+# Benchmarks ----------------------------------------------------------------------------------------------------------------------------------
+
+
+def unpacked(state):
+    """A FreecellState of a packed sample, with an empty undo log as in the solvers."""
+    return state.to_state()
+
+def move_executor_cases(states):
+    """Returns {executor name: (executor, [argument tuples])} for every legal move of every state."""
+    executors = {
+        'move_tableau_to_foundation': (fcm.move_tableau_to_foundation, []),
+        'move_tableau_to_freecell': (fcm.move_tableau_to_freecell, []),
+        'move_freecell_to_foundation': (fcm.move_freecell_to_foundation, []),
+        'move_tableau_to_tableau': (fcm.move_tableau_to_tableau, []),
+        'move_freecell_to_tableau': (fcm.move_freecell_to_tableau, []),
+        'execute_supermove': (fcm.execute_supermove, []),
+        'move_foundation_to_tableau': (fcm.move_foundation_to_tableau, []),
+        'move_foundation_to_freecell': (fcm.move_foundation_to_freecell, []),
+    }
+    for state in states:
+        for move in fcm.get_possible_moves(state, True):
+            if move.move_type in ('tableau_to_tableau', 'freecell_to_tableau'):
+                args = (state, move.source, move.destination, True)
+            elif move.move_type == 'foundation_to_tableau':
+                args = (state, move.source, move.destination)  # The foundation executors have no AImode
+            elif move.move_type == 'foundation_to_freecell':
+                args = (state, move.source)
+            else:
+                args = (state, move.source, True)
+            executors['move_' + move.move_type][1].append(args)
+        for supermove in fcm.get_possible_supermoves(state):
+            executors['execute_supermove'][1].append((state, *supermove, True))
+    return executors
+
+def benchmarks(corpus):
+    """
+    Returns {name: (function, [argument tuples], fresh)} for every primitive. `fresh` builds new arguments for every
+    pass, for the primitives that modify the state they are given.
+    """
+    states = [unpacked(state) for state in corpus]
+    copies = [state.copy() for state in states]
+    packed_copies = [PackedState(state.tableau, state.free_cells, state.foundations) for state in corpus]
+    packed_moves = [(state, move) for state in corpus
+                    for move in state.get_possible_moves_Astar() + state.get_possible_supermoves()]
+
+    cases = {
+        'state.copy': (FreecellState.copy, [(s,) for s in states], None),
+        'state.__hash__': (hash, [(s,) for s in states], None),
+        'state.__eq__': (FreecellState.__eq__, list(zip(states, copies)), None),
+        'state.heuristic': (FreecellState.heuristic, [(s,) for s in states], None),
+        'fcm.get_possible_moves': (fcm.get_possible_moves, [(s, True) for s in states], None),
+        'fcm.get_possible_moves_Astar': (fcm.get_possible_moves_Astar, [(s,) for s in states], None),
+        'fcm.get_possible_supermoves': (fcm.get_possible_supermoves, [(s,) for s in states], None),
+        'fcm.apply_automatic_moves': (fcm.apply_automatic_moves, None,
+                                      lambda: [(unpacked(s),) for s in corpus]),
+        'packed.from_state': (PackedState.from_state, [(s,) for s in states], None),
+        'packed.__hash__': (hash, [(s,) for s in corpus], None),
+        'packed.__eq__': (PackedState.__eq__, list(zip(corpus, packed_copies)), None),
+        'packed.heuristic': (PackedState.compute_heuristic, [(s,) for s in corpus], None),
+        'packed.get_possible_moves': (PackedState.get_possible_moves, [(s,) for s in corpus], None),
+        'packed.get_possible_moves_Astar': (PackedState.get_possible_moves_Astar, [(s,) for s in corpus], None),
+        'packed.get_possible_supermoves': (PackedState.get_possible_supermoves, [(s,) for s in corpus], None),
+        'packed.apply_automatic_moves': (PackedState.apply_automatic_moves, [(s,) for s in corpus], None),
+        'packed.child': (PackedState.child, packed_moves, None),
+    }
+    # The samples have had their automatic moves applied, so they have no moves to the foundations left: the executors
+    # also run on the children of the samples before their automatic moves, and on those children with a card that
+    # could go to its foundation parked in a free cell instead
+    pending = [unpacked(state.apply_move(move)) for state, move in packed_moves if not isinstance(move, tuple)]
+    pending = pending[::max(1, len(pending) // len(states))]
+    parked = [fcm.move_tableau_to_freecell(state, move.source, True) for state in pending
+              for move in fcm.get_possible_moves(state, True) if move.move_type == 'tableau_to_foundation']
+    executor_states = states + pending + [state for state in parked if state is not None]
+    for name, (executor, args) in move_executor_cases(executor_states).items():
+        # Executors copy the state before changing it, so the same arguments can be reused
+        cases['fcm.' + name] = (executor, args, None)
+    return cases
+
+def measure(function, args, fresh=None, repeat=REPEAT):
+    """
+    Runs `function` on every argument tuple, `repeat` times, and returns (ns/op, bytes/op, blocks/op): the best time
+    per call, the mean peak memory allocated during a call and the mean number of blocks still allocated after it.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        cases = fresh() if fresh else args
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            for case in cases:
+                function(*case)
+            best = min(best, (time.perf_counter_ns() - start) / len(cases))
+        finally:
+            gc.enable()
+
+    # Allocations are measured in a separate pass since tracing slows every allocation down
+    cases = fresh() if fresh else args
+    results = [None] * len(cases)  # Allocated up front so that keeping the results doesn't count
+    peak_bytes = 0
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        blocks = sys.getallocatedblocks()
+        for i, case in enumerate(cases):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            results[i] = function(*case)
+            peak_bytes += tracemalloc.get_traced_memory()[1] - before
+        blocks = sys.getallocatedblocks() - blocks
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return best, peak_bytes / len(cases), blocks / len(cases)
+
+def run_microbenchmarks(corpus, repeat=REPEAT, name_filter=None):
+    """Measures every primitive matching `name_filter` and yields (name, cases, ns/op, bytes/op, blocks/op)."""
+    for name, (function, args, fresh) in benchmarks(corpus).items():
+        if name_filter and name_filter not in name:
+            continue
+        cases = len(fresh() if fresh else args)
+        if not cases:
+            continue
+        yield (name, cases, *measure(function, args, fresh, repeat))
+
+
+def main(argv=None):
+    """Parses the command line, builds the corpus and prints a table of the measurements."""
+    parser = argparse.ArgumentParser(description="Micro-benchmark the Freecell state and move primitives.")
+    parser.add_argument('--corpus-size', type=int, default=CORPUS_SIZE, help="number of sampled states")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="timed passes over the corpus (the best is kept)")
+    parser.add_argument('--filter', default=None, help="only run the primitives whose name contains this text")
+    args = parser.parse_args(argv)
+
+    set_level(QUIET)
+    start_time = time.time()
+    corpus = build_corpus(args.corpus_size)
+    print(f"Sampled {len(corpus)} states from solver runs in {time.time() - start_time:.2f} seconds.")
+
+    print(f"{'primitive':<38} {'cases':>7} {'ns/op':>10} {'bytes/op':>10} {'blocks/op':>10}")
+    for name, cases, ns, peak_bytes, blocks in run_microbenchmarks(corpus, args.repeat, args.filter):
+        print(f"{name:<38} {cases:>7} {ns:>10.0f} {peak_bytes:>10.0f} {blocks:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
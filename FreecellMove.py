@@ -1,5 +1,6 @@
 from Card import Card
 from Move import Move
+from FreecellLog import log, enabled, DEBUG
 
 # Possible Moves ----------------------------------------------------------------------------------------------------------------------------------------------
 
@@ -10,7 +11,7 @@ def get_possible_moves_Astar(state):
     """
     moves = []
     
-    last_state = state.history[-1] if state.history else None  # Last state for comparison
+    last = state.last_transfer()  # Last (source, destination, num_cards) transfer for comparison
 
     # Moves from tableau to foundation (always a good move)
     for i, column in enumerate(state.tableau):
@@ -22,7 +23,7 @@ def get_possible_moves_Astar(state):
     # Moves from tableau to freecell (avoid reversing freecell_to_tableau)
     for i, column in enumerate(state.tableau):
         if column and can_move_to_freecell(state):
-            if not (last_state and last_state.free_cells.count(None) < state.free_cells.count(None)):  
+            if not (last and last[0][0] == "freecell"):  
                 moves.append(Move("tableau_to_freecell", i, None))
 
     # Moves from tableau to tableau (avoid reversing last tableau_to_tableau move)
@@ -30,7 +31,7 @@ def get_possible_moves_Astar(state):
         if column:
             for j, target_column in enumerate(state.tableau):
                 if i != j and can_move_to_tableau(state, column[-1], j):
-                    if not (last_state and last_state.tableau[j] and last_state.tableau[j][-1] == column[-1]):
+                    if not (last and last[0] == ("tableau", j) and last[1] == ("tableau", i)):
                         moves.append(Move("tableau_to_tableau", i, j))
 
     # Moves from freecell to foundation (always a good move)
@@ -43,7 +44,7 @@ def get_possible_moves_Astar(state):
         if card:
             for j, column in enumerate(state.tableau):
                 if can_move_to_tableau(state, card, j):
-                    if not (last_state and last_state.tableau[j] and last_state.tableau[j][-1] == card):
+                    if not (last and last[0] == ("tableau", j) and last[1] == ("freecell", i)):
                         moves.append(Move("freecell_to_tableau", i, j))
 
     # print("Valid moves----------------------------")
@@ -94,26 +95,27 @@ def get_possible_moves(state, AImode=False):
         if state.foundations[suit] > 1 and can_move_to_freecell(state):
             moves.append(Move("foundation_to_freecell", suit, None))
 
-    if not AImode:
-        print("Valid moves----------------------------")
+    if not AImode and enabled(DEBUG):
+        log(DEBUG, "Valid moves----------------------------")
         for i in moves:
-            print(i)
-        print("---------------------------------------")
+            log(DEBUG, i)
+        log(DEBUG, "---------------------------------------")
     return moves
 
 def get_possible_supermoves(state):
     """
     Determine all possible supermoves in the current game state, returning a list of valid supermoves between tableau columns.
-    Each supermove is represented as a tuple (source_column, destination_column, number_of_cards).
+    Each supermove is represented as a tuple (source_column, destination_column, number_of_cards), with one tuple per legal
+    number of cards. Empty columns are interchangeable, so only the first one is used as a destination.
     """
     supermoves = []
+    first_empty = next((i for i, col in enumerate(state.tableau) if not col), None)
 
     for src in range(len(state.tableau)):
-        if state.tableau[src]:  # Ensure source column is not empty
+        if len(state.tableau[src]) > 1:  # Ensure source column has a sequence to move
             for dest in range(len(state.tableau)):
-                if src != dest:  # Avoid moving to the same column
-                    num_cards = can_supermove(state, src, dest)
-                    if num_cards > 0:
+                if src != dest and (state.tableau[dest] or dest == first_empty):  # Avoid moving to the same column
+                    for num_cards in supermove_lengths(state, src, dest):
                         supermoves.append((src, dest, num_cards))
 
     return supermoves
@@ -224,7 +226,7 @@ def move_tableau_to_foundation(state, col, AImode=False):
             new_state = state.copy()
             new_state.tableau[col].pop()
             new_state.foundations[card.suit] = card.rank
-            if not AImode: print(f"TB-F {card.rank} of {card.suit}\n")
+            if not AImode: log(DEBUG, f"TB-F {card.rank} of {card.suit}\n")
             return new_state
     return None
 
@@ -244,7 +246,7 @@ def move_tableau_to_freecell(state, col, AImode=False):
         for i in range(len(state.free_cells)):
             if state.free_cells[i] is None:  # Find an empty FreeCell
                 new_state = state.copy()
-                if not AImode: print(f"TB{col}-FC {new_state.tableau[col][-1].rank} of {new_state.tableau[col][-1].suit}\n")
+                if not AImode: log(DEBUG, f"TB{col}-FC {new_state.tableau[col][-1].rank} of {new_state.tableau[col][-1].suit}\n")
                 new_state.free_cells[i] = new_state.tableau[col].pop()  # Modify the copied state
                 return new_state
     return None
@@ -267,7 +269,7 @@ def move_freecell_to_foundation(state, fc, AImode=False):
             new_state = state.copy()
             new_state.free_cells[fc] = None
             new_state.foundations[card.suit] = card.rank
-            if not AImode: print(f"FC-F {card.rank} of {card.suit}\n")
+            if not AImode: log(DEBUG, f"FC-F {card.rank} of {card.suit}\n")
             return new_state
     return None
 
@@ -288,7 +290,7 @@ def move_tableau_to_tableau(state, src, dest, AImode=False):
         if can_move_to_tableau(state, card, dest):
             new_state = state.copy()
             new_state.tableau[dest].append(new_state.tableau[src].pop())
-            if not AImode: print(f"TB{src}-TB{dest} {card.rank} of {card.suit}\n")
+            if not AImode: log(DEBUG, f"TB{src}-TB{dest} {card.rank} of {card.suit}\n")
             return new_state
     return None
 
@@ -310,7 +312,7 @@ def move_freecell_to_tableau(state, fc, col, AImode=False):
             new_state = state.copy()
             new_state.tableau[col].append(card)
             new_state.free_cells[fc] = None
-            if not AImode: print(f"FC-TB{col} {card.rank} of {card.suit}\n")
+            if not AImode: log(DEBUG, f"FC-TB{col} {card.rank} of {card.suit}\n")
             return new_state
     return None
 
@@ -332,7 +334,7 @@ def move_foundation_to_tableau(state, suit, col):
             new_state = state.copy()
             new_state.foundations[suit] -= 1
             new_state.tableau[col].append(card)
-            print(f"F-TB {card.rank} of {card.suit}\n")
+            log(DEBUG, f"F-TB {card.rank} of {card.suit}\n")
             return new_state
     return None
 
@@ -355,44 +357,50 @@ def move_foundation_to_freecell(state, suit):
                 new_state = state.copy()
                 new_state.free_cells[i] = new_card
                 new_state.foundations[suit] -= 1
-                print(f"{new_card.rank} of {new_card.suit}\n")
+                log(DEBUG, f"F-FC {new_card.rank} of {new_card.suit}\n")
                 return new_state
     return None
 
 # Supermove Move Checker and Executor --------------------------------------------------------------------------------------------------------------------------------
 
 
-def can_supermove(state, src, dest):
+def ordered_tail_length(column):
+    """Returns the number of cards on top of a column that form a sequence of alternating colours and decreasing rank."""
+    length = 1 if column else 0
+    while length < len(column):
+        card, below = column[-length], column[-length - 1]
+        if below.rank != card.rank + 1 or below.colour == card.colour:
+            break
+        length += 1
+    return length
+
+def supermove_lengths(state, src, dest):
     """
-    Determines the number of cards that can be moved as a supermove from a source column to a destination column in a Freecell game state.
-    Returns the number of cards that can be moved if valid, otherwise returns 0.
+    Determines every number of cards (2 or more) that can be moved as a supermove from a source column to a destination column
+    in a Freecell game state. At most (free cells + 1) * 2 ^ (empty columns other than the destination) cards can be moved.
     """
-
-    if not state.tableau[src]:
-        return 0  # Source column is empty
+    src_column = state.tableau[src]
+    if not src_column:
+        return []  # Source column is empty
 
     # Calculate the maximum number of cards that can be moved
     free_cells = sum(1 for cell in state.free_cells if cell is None)
-    empty_columns = sum(1 for col in state.tableau if not col and col != state.tableau[dest])
-    max_cards = (free_cells + 1) * (2 ** empty_columns)
+    empty_columns = sum(1 for i, col in enumerate(state.tableau) if not col and i != dest)
+    max_cards = min(ordered_tail_length(src_column), (free_cells + 1) * (2 ** empty_columns))
 
-    # Identify the cards to move
-    src_column = state.tableau[src]
-    for num_cards in range(2, min(len(src_column), max_cards) + 1):
-        cards_to_move = src_column[-num_cards:]
+    if not state.tableau[dest]:
+        # Any sequence fits on an empty column, but moving the whole column there would change nothing
+        return list(range(2, min(max_cards, len(src_column) - 1) + 1))
+    return [num_cards for num_cards in range(2, max_cards + 1)
+            if can_move_to_tableau(state, src_column[-num_cards], dest)]
 
-        # Check if the cards are together, alternating colors, and in decreasing rank
-        valid_sequence = True
-        for i in range(len(cards_to_move) - 1):
-            if (cards_to_move[i].rank != cards_to_move[i + 1].rank + 1 or
-                cards_to_move[i].colour == cards_to_move[i + 1].colour):
-                valid_sequence = False
-                break
-
-        if valid_sequence and can_move_to_tableau(state, cards_to_move[0], dest):
-            return num_cards  # Return the number of cards that can be moved
-
-    return 0  # No valid supermove found
+def can_supermove(state, src, dest):
+    """
+    Determines the number of cards that can be moved as a supermove from a source column to a destination column in a Freecell game state.
+    Returns the smallest number of cards that can be moved if valid, otherwise returns 0.
+    """
+    lengths = supermove_lengths(state, src, dest)
+    return lengths[0] if lengths else 0
 
 def execute_supermove(state, src, dest, num_cards, AImode=False):
     """
@@ -404,9 +412,8 @@ def execute_supermove(state, src, dest, num_cards, AImode=False):
 
     # Check if the move is valid
     new_state = state.copy()
-    new_state.save_state()  # Save current state before applying the move
     new_state.tableau[dest].extend(new_state.tableau[src][-num_cards:])
     del new_state.tableau[src][-num_cards:]
-    if not AImode: print(f"S {src} {dest} {num_cards}")
+    if not AImode: log(DEBUG, f"S {src} {dest} {num_cards}")
 
     return new_state
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+On-disk solution database: remembers every solution found, so solving a deal again (or any state along one of its
+solutions) is a lookup instead of a search.
+
+    python FreecellSolutions.py --presets --deals 1-100      # precompute the presets and Microsoft deals 1 to 100
+    python FreecellSolutions.py --presets --cache saves/solver_cache.bin   # reuse and update the GUI's solver cache
+
+Every state along a stored solution gets a row, keyed by its canonical hash so that states which only differ in
+column order or free cell slots share their solution. A row holds the state itself, the next move of the solution
+from it, the number of moves left and the solver that found it, so a lookup follows the rows from the given state
+to the solved one. The moves are stored for the state of the row and translated (PackedState.translate_move) onto
+the state being looked up, whose columns and free cells may be arranged differently.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+import FreecellAI as ai
+import FreecellCache
+from FreecellDeals import load_deals, parse_seeds
+from FreecellState import FreecellState
+from Move import Move
+from PackedState import PackedState
+from FreecellLog import log, INFO
+
+DATABASE = os.path.join("saves", "solutions.db")
+
+SUPERMOVE = re.compile(r"Supermove\(source=(\d+), destination=(\d+), number of cards=(\d+)\)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key INTEGER PRIMARY KEY,  -- canonical hash of the state, as a signed 64-bit integer
+    state BLOB NOT NULL,      -- the state the move applies to (see pack_state)
+    move TEXT,                -- next move of the solution as JSON, NULL for a solved state
+    remaining INTEGER NOT NULL,
+    solver TEXT,
+    created REAL NOT NULL
+)
+"""
+
+
+# Encoding ------------------------------------------------------------------------------------------------------------------------------------
+
+
+def row_key(state):
+    """Returns the canonical hash of a PackedState as the signed integer SQLite stores."""
+    key = state.canonical
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+def pack_state(state):
+    """Encodes a PackedState as bytes: every column prefixed by its length, then the free cells and foundations."""
+    return b''.join(bytes([len(col)]) + col for col in state.tableau) + state.free_cells + state.foundations
+
+def unpack_state(data):
+    """Decodes the bytes of pack_state into a PackedState."""
+    tableau = []
+    i = 0
+    for _ in range(8):
+        tableau.append(data[i + 1:i + 1 + data[i]])
+        i += 1 + data[i]
+    return PackedState(tuple(tableau), data[i:i + 4], data[i + 4:i + 8])
+
+def parse_move(move):
+    """Turns a solver path entry (a Move or a "Supermove(...)" string) into a Move or a (src, dest, num_cards) tuple."""
+    if isinstance(move, str):
+        match = SUPERMOVE.match(move)
+        return tuple(int(n) for n in match.groups())
+    return move
+
+def format_move(move):
+    """Turns a Move or supermove tuple back into a solver path entry, the format FreecellGui plays back."""
+    if isinstance(move, tuple):
+        src, dest, num_cards = move
+        return f"Supermove(source={src}, destination={dest}, number of cards={num_cards})"
+    return move
+
+def encode_move(move):
+    """Encodes a Move or supermove tuple as JSON."""
+    if isinstance(move, tuple):
+        return json.dumps(list(move))
+    return json.dumps({'type': move.move_type, 'source': move.source, 'destination': move.destination})
+
+def decode_move(text):
+    """Decodes the JSON of encode_move."""
+    data = json.loads(text)
+    if isinstance(data, list):
+        return tuple(data)
+    return Move(data['type'], data['source'], data['destination'])
+
+
+# Database ------------------------------------------------------------------------------------------------------------------------------------
+
+
+def connect(path=DATABASE):
+    """Opens the solution database, creating it if needed. Each call opens its own connection, so any thread can."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute(SCHEMA)
+    return connection
+
+def lookup(game, path=DATABASE):
+    """
+    Returns a solution of a FreecellState from the database, as the list of moves a solver would return, or None if
+    neither the state nor an equivalent one is on a stored solution.
+    """
+    if not os.path.exists(path):
+        return None
+    current = PackedState.from_state(game).apply_automatic_moves()
+    moves = []
+    connection = connect(path)
+    try:
+        while True:
+            row = connection.execute("SELECT state, move FROM solutions WHERE key = ?", (row_key(current),)).fetchone()
+            if row is None:
+                return None
+            stored = unpack_state(row[0])
+            if stored.canonical_key() != current.canonical_key():
+                return None  # Hash collision with another state
+            if row[1] is None:
+                return moves
+            move = stored.translate_move(decode_move(row[1]), current)
+            moves.append(format_move(move))
+            current = current.child(move)
+    finally:
+        connection.close()
+
+def store(game, solution, solver=None, path=DATABASE):
+    """
+    Adds a solution of a FreecellState to the database: one row for every state along it. A state that already has
+    a row keeps it unless the new solution is shorter from there. Returns False if the solution doesn't solve the game.
+    """
+    state = PackedState.from_state(game).apply_automatic_moves()
+    states = [state]
+    moves = [parse_move(move) for move in solution]
+    for move in moves:
+        state = state.child(move)
+        states.append(state)
+    if not state.is_solved():
+        return False
+
+    now = time.time()
+    rows = [(row_key(state), pack_state(state), encode_move(move) if move is not None else None,
+             len(moves) - i, solver, now)
+            for i, (state, move) in enumerate(zip(states, moves + [None]))]
+    connection = connect(path)
+    try:
+        with connection:
+            connection.executemany("""
+                INSERT INTO solutions (key, state, move, remaining, solver, created) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET state = excluded.state, move = excluded.move,
+                    remaining = excluded.remaining, solver = excluded.solver, created = excluded.created
+                WHERE excluded.remaining < solutions.remaining
+            """, rows)
+    finally:
+        connection.close()
+    return True
+
+
+# Precomputing --------------------------------------------------------------------------------------------------------------------------------
+
+
+def main(argv=None):
+    """Parses the command line and solves every requested deal that isn't in the database yet."""
+    parser = argparse.ArgumentParser(description="Precompute solutions into the solution database.")
+    parser.add_argument('--presets', action='store_true', help="solve every entry of saves/presets.json")
+    parser.add_argument('--deals', type=parse_seeds, default=[], help='Microsoft FreeCell deal numbers, e.g. "1-100,617"')
+    parser.add_argument('--weight', type=float, default=3.0, help="weight of the weighted A* solver used")
+    parser.add_argument('--database', default=DATABASE, help="solution database file")
+    parser.add_argument('--cache', default=None, metavar='FILE',
+                        help="solver cache file to load and update, shared by the deals (default: no cache)")
+    args = parser.parse_args(argv)
+    if args.cache:
+        FreecellCache.set_cache(FreecellCache.SolverCache(path=args.cache))
+
+    presets = [str(i) for i in range(len(FreecellState.load_presets("presets.json")))] if args.presets else []
+    for name, game in load_deals(args.deals, presets=presets):
+        if lookup(game, args.database) is not None:
+            log(INFO, f"{name}: already in the database")
+            continue
+        solution = ai.solve_game_astar(game, weight=args.weight)
+        if solution is not None and store(game, solution, f"Weighted A* (w={args.weight})", args.database):
+            log(INFO, f"{name}: stored a solution of {len(solution)} moves")
+        else:
+            log(INFO, f"{name}: no solution found")
+    if args.cache:
+        FreecellCache.CACHE.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import copy
 from Card import Card
 from Move import Move
 import FreecellMove as fcm
+from FreecellLog import log, enabled, TRACE
 import random
 import os
 import json
@@ -27,27 +28,23 @@ class FreecellState:
         self.tableau = tableau  # 8 tableau columns
         self.free_cells = free_cells if free_cells else [None] * 4  # 4 free cells
         self.foundations = foundations if foundations else {suit: 0 for suit in ['hearts', 'diamonds', 'clubs', 'spades']}
-        self.history = []
+        self.move_log = []  # Undo log: one group of card transfers per player move (see record_transfer)
         self.minutes = minutes
         self.seconds = seconds
 
     def copy(self):
-        """Creates a deep copy of the current FreecellState instance."""
-        new_state= FreecellState([col[:] for col in self.tableau], self.free_cells[:], self.foundations.copy())
-        new_state.history = self.history[:]
-        return new_state
+        """Creates a deep copy of the board of the current FreecellState instance. The undo log is not copied."""
+        return FreecellState([col[:] for col in self.tableau], self.free_cells[:], self.foundations.copy())
 
     def is_solved(self):
         """Checks if the current FreecellState is in a solved state."""
         return all(self.foundations[suit] == 13 for suit in self.foundations)
 
     def undo(self):
-        """Reverts the FreecellState to the previous state if there is any history."""
-        if self.history:
-            previous_state = self.history.pop()
-            self.tableau = previous_state.tableau
-            self.free_cells = previous_state.free_cells
-            self.foundations = previous_state.foundations
+        """Reverts the last player move, along with the automatic moves that followed it, by replaying the inverse transfers."""
+        if self.move_log:
+            for source, destination, num_cards in reversed(self.move_log.pop()):
+                self.transfer(destination, source, num_cards)
         self.heuristic()
         return self
 
@@ -83,16 +80,47 @@ class FreecellState:
         foundations = state['foundations']
         return FreecellState(tableau, free_cells, foundations)
     
-    def save_state(self):
-        """Saves the current state to the history for undo functionality."""
-        self.history.append(self.copy())
+    def record_transfer(self, source, destination, num_cards=1, new_group=False):
+        """
+        Records a card transfer in the undo log. A location is a tuple ('tableau', column), ('freecell', index) or
+        ('foundation', suit). Player moves start a new group; the automatic moves that follow join the player's group.
+        """
+        if new_group:
+            self.move_log.append([])
+        if self.move_log:
+            self.move_log[-1].append((source, destination, num_cards))
+
+    def last_transfer(self):
+        """Returns the most recent transfer in the undo log, or None."""
+        return self.move_log[-1][-1] if self.move_log and self.move_log[-1] else None
+
+    def transfer(self, source, destination, num_cards=1):
+        """Moves `num_cards` cards between two locations without checking the game rules (used to undo moves)."""
+        kind, index = source
+        if kind == "tableau":
+            cards = self.tableau[index][-num_cards:]
+            del self.tableau[index][-num_cards:]
+        elif kind == "freecell":
+            cards = [self.free_cells[index]]
+            self.free_cells[index] = None
+        else:
+            cards = [Card(self.foundations[index], index)]
+            self.foundations[index] -= 1
+
+        kind, index = destination
+        if kind == "tableau":
+            self.tableau[index].extend(cards)
+        elif kind == "freecell":
+            self.free_cells[index] = cards[0]
+        else:
+            self.foundations[index] = cards[0].rank
 
     @staticmethod
-    def create_random_state():
-        """Creates a random initial game state."""
+    def create_random_state(seed=None):
+        """Creates a random initial game state. The same `seed` always deals the same game."""
         # Create a deck of cards
         deck = [Card(rank, suit) for suit in ['hearts', 'diamonds', 'clubs', 'spades'] for rank in range(1, 14)]
-        random.shuffle(deck)
+        (random.Random(seed) if seed is not None else random).shuffle(deck)
         
         # Distribute cards to tableau columns
         tableau = [[] for _ in range(8)]
@@ -145,14 +173,39 @@ class FreecellState:
             new_state = fcm.move_foundation_to_freecell(self, move.source)
         
         if new_state:
-            if not AImode:
-                #print("Apply move: " + move.__repr__())
-                self.save_state()  # Save current state before applying the move
+            #print("Apply move: " + move.__repr__())
+            self.record_transfer(*self.move_locations(move), new_group=not AImode)
             self.tableau = new_state.tableau
             self.free_cells = new_state.free_cells
             self.foundations = new_state.foundations
         return self
 
+    def apply_supermove(self, src, dest, num_cards, AImode=False):
+        """Applies a supermove to the current FreecellState, recording it in the undo log."""
+        new_state = fcm.execute_supermove(self, src, dest, num_cards, AImode)
+        if new_state:
+            self.record_transfer(("tableau", src), ("tableau", dest), num_cards, new_group=not AImode)
+            self.tableau = new_state.tableau
+        return self
+
+    def move_locations(self, move):
+        """Returns the (source, destination) locations of a move, as used by the undo log, before it is applied."""
+        move_type = move.move_type
+        if move_type == "tableau_to_foundation":
+            return ("tableau", move.source), ("foundation", self.tableau[move.source][-1].suit)
+        elif move_type == "tableau_to_freecell":
+            return ("tableau", move.source), ("freecell", self.free_cells.index(None))
+        elif move_type == "freecell_to_foundation":
+            return ("freecell", move.source), ("foundation", self.free_cells[move.source].suit)
+        elif move_type == "tableau_to_tableau":
+            return ("tableau", move.source), ("tableau", move.destination)
+        elif move_type == "freecell_to_tableau":
+            return ("freecell", move.source), ("tableau", move.destination)
+        elif move_type == "foundation_to_tableau":
+            return ("foundation", move.source), ("tableau", move.destination)
+        else:
+            return ("foundation", move.source), ("freecell", self.free_cells.index(None))
+
     def get_possible_moves(self, AImode=False):
         """Calls get_possible_moves from FreecellMove."""
         return fcm.get_possible_moves(self, AImode)
@@ -205,12 +258,13 @@ class FreecellState:
                  w['fc'] * blocked_free_cells +
                  w['fcol'] * free_columns)
 
-        print(f"Foundation: {w['foundation'] * foundation_score}, "
-              f"Blocked: {w['blocked'] * blocked_next_cards}, "
-              f"Free Cells: {w['fc'] * blocked_free_cells}, "
-              f"Free Columns: {w['fcol'] * free_columns}, "
-              f"Modifier: {w['modifier']}, "
-              f"Total: {score}")
+        if enabled(TRACE):
+            log(TRACE, f"Foundation: {w['foundation'] * foundation_score}, "
+                      f"Blocked: {w['blocked'] * blocked_next_cards}, "
+                      f"Free Cells: {w['fc'] * blocked_free_cells}, "
+                      f"Free Columns: {w['fcol'] * free_columns}, "
+                      f"Modifier: {w['modifier']}, "
+                      f"Total: {score}")
 
         #print(f"Foundation: {round(foundation_weight * foundation_score,3)}, Blocked: {round(blocked_weight * blocked_next_cards,3)}, Free Cells: {round(fc_weight * blocked_free_cells,3)}, Free Columns: {round(fcol_weight * free_columns,3)}, Total: {score}\n")
         return score
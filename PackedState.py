@@ -0,0 +1,625 @@
+import random
+from Card import DECK
+from Move import Move
+from FreecellState import FreecellState, HEURISTIC_WEIGHTS
+
+# Card Encoding -------------------------------------------------------------------------------------------------------------------------------
+
+# Every card is a small int: suit index * 13 + (rank - 1), so 0-12 are hearts, 13-25 diamonds, 26-38 clubs and 39-51 spades.
+SUITS = ['hearts', 'diamonds', 'clubs', 'spades']
+EMPTY = 255  # Marker for an empty free cell
+
+RANK = bytes(c % 13 + 1 for c in range(52))
+SUIT = bytes(c // 13 for c in range(52))
+RED = bytes(1 if c // 13 < 2 else 0 for c in range(52))
+
+# Move Tables ---------------------------------------------------------------------------------------------------------------------------------
+
+# CAN_STACK[card * 52 + top] is 1 if `card` can be placed on `top` in a tableau column (descending rank, alternating
+# colours), and STACK_TARGETS[card] lists the (at most two) cards it can be placed on.
+CAN_STACK = bytes(1 if RANK[card] == RANK[top] - 1 and RED[card] != RED[top] else 0
+                  for card in range(52) for top in range(52))
+STACK_TARGETS = [tuple(top for top in range(52) if CAN_STACK[card * 52 + top]) for card in range(52)]
+
+
+# Zobrist Hashing -----------------------------------------------------------------------------------------------------------------------------
+
+# A tableau card is keyed by the card right below it (or by the bottom of its column when it has none), so moving a
+# whole sequence only changes the key of its lowest card. Seeded so hashes are the same in every run and process.
+# The canonical hash uses a single key for every column bottom and every free cell slot, so it is the same for
+# states that only differ in the order of their columns or in which free cell holds each card.
+_zobrist_rng = random.Random(20250318)
+BOTTOM = 52  # Predecessor index of the bottom card of column i is BOTTOM + i
+ANY_BOTTOM = BOTTOM + 8  # Column-independent bottom, used by the canonical hash
+ANY_SLOT = 4  # Slot-independent free cell, used by the canonical hash
+Z_TABLEAU = [[_zobrist_rng.getrandbits(64) for _ in range(ANY_BOTTOM + 1)] for _ in range(52)]
+Z_FREECELL = [[_zobrist_rng.getrandbits(64) for _ in range(ANY_SLOT + 1)] for _ in range(52)]
+Z_FOUNDATION = [[_zobrist_rng.getrandbits(64) for _ in range(14)] for _ in range(4)]
+
+
+def zobrist_hash(tableau, free_cells, foundations, canonical=False):
+    """Computes the (exact or canonical) Zobrist hash of a packed state from scratch."""
+    h = 0
+    for i, col in enumerate(tableau):
+        pred = ANY_BOTTOM if canonical else BOTTOM + i
+        for c in col:
+            h ^= Z_TABLEAU[c][pred]
+            pred = c
+    for i, c in enumerate(free_cells):
+        if c != EMPTY:
+            h ^= Z_FREECELL[c][ANY_SLOT if canonical else i]
+    for s, rank in enumerate(foundations):
+        h ^= Z_FOUNDATION[s][rank]
+    return h
+
+
+# DECK is ordered like the encoding, so a card's int is its index in it
+CARD_INDEX = {card: i for i, card in enumerate(DECK)}
+
+
+# Card Locations ------------------------------------------------------------------------------------------------------------------------------
+
+# Every state keeps the location of each card in a 52-byte string: COLUMN_STRIDE * column + depth for tableau cards,
+# IN_FREECELL + slot for free cells and ON_FOUNDATION for cards already on their foundation.
+COLUMN_STRIDE = 24
+IN_FREECELL = 200
+ON_FOUNDATION = 255
+
+
+def card_locations(tableau, free_cells):
+    """Computes the location of every card from scratch."""
+    locations = bytearray([ON_FOUNDATION]) * 52
+    for i, col in enumerate(tableau):
+        for depth, c in enumerate(col):
+            locations[c] = COLUMN_STRIDE * i + depth
+    for i, c in enumerate(free_cells):
+        if c != EMPTY:
+            locations[c] = IN_FREECELL + i
+    return bytes(locations)
+
+
+def card_runs(tableau):
+    """
+    Computes from scratch the length of the ordered sequence ending at every tableau card, counted from the card
+    down to the first card that is not stacked on the one below it. The run of a column is the run of its top card.
+    """
+    runs = bytearray(52)
+    for col in tableau:
+        run, below = 0, None
+        for c in col:
+            run = run + 1 if below is not None and CAN_STACK[c * 52 + below] else 1
+            runs[c] = run
+            below = c
+    return bytes(runs)
+
+
+def card_to_int(card):
+    """Encodes a Card object as an int between 0 and 51."""
+    return CARD_INDEX[card]
+
+def int_to_card(c):
+    """Decodes an int between 0 and 51 back into the shared Card object."""
+    return DECK[c]
+
+def can_stack(card, top):
+    """Check if `card` can be placed on `top` in a tableau column (descending rank, alternating colours)."""
+    return CAN_STACK[card * 52 + top]
+
+
+class PackedState:
+    """
+    Compact, immutable game state used by the solvers.
+    The tableau is a tuple of 8 byte strings (one card per byte, bottom to top), the free cells are a 4-byte string
+    using EMPTY for empty cells and the foundations are a 4-byte string with the top rank of each suit, in SUITS order.
+    Every move returns a new PackedState that shares the untouched columns with its parent, and carries a 64-bit
+    Zobrist hash that the move executors update in O(1) instead of rehashing the whole state, along with the
+    canonical hash used by canonical_key().
+    The heuristic inputs are kept as metadata that the executors also update incrementally: the location of every card
+    (see card_locations), the number of free columns and the number of occupied free cells.
+    The move generators rely on the precomputed stacking tables, the card locations and the ordered run length of
+    every tableau card (see card_runs), which the executors keep up to date as well.
+    As a search node, a state only remembers the state it was generated from (`parent`) and the move applied to it
+    (`move`), so the solution path is rebuilt by following parents instead of copying move histories.
+    """
+    __slots__ = ('tableau', 'free_cells', 'foundations', 'zobrist', 'canonical', 'locations', 'free_columns',
+                 'occupied_cells', 'runs', 'parent', 'move', 'h')
+
+    def __init__(self, tableau, free_cells, foundations, zobrist=None, canonical=None,
+                 locations=None, free_columns=None, occupied_cells=None, runs=None):
+        self.tableau = tableau
+        self.free_cells = free_cells
+        self.foundations = foundations
+        self.zobrist = zobrist if zobrist is not None else zobrist_hash(tableau, free_cells, foundations)
+        self.canonical = canonical if canonical is not None else zobrist_hash(tableau, free_cells, foundations, True)
+        self.locations = locations if locations is not None else card_locations(tableau, free_cells)
+        self.free_columns = free_columns if free_columns is not None else tableau.count(b'')
+        self.occupied_cells = occupied_cells if occupied_cells is not None else 4 - free_cells.count(EMPTY)
+        self.runs = runs if runs is not None else card_runs(tableau)
+        self.parent = None
+        self.move = None
+        self.h = None  # Cached heuristic value
+
+    @staticmethod
+    def from_state(state):
+        """Packs a FreecellState into a PackedState."""
+        tableau = tuple(bytes(card_to_int(card) for card in col) for col in state.tableau)
+        free_cells = bytes(card_to_int(card) if card else EMPTY for card in state.free_cells)
+        foundations = bytes(state.foundations.get(suit, 0) for suit in SUITS)
+        return PackedState(tableau, free_cells, foundations)
+
+    def to_state(self):
+        """Unpacks this PackedState into a new FreecellState."""
+        tableau = [[int_to_card(c) for c in col] for col in self.tableau]
+        free_cells = [int_to_card(c) if c != EMPTY else None for c in self.free_cells]
+        foundations = {suit: self.foundations[i] for i, suit in enumerate(SUITS)}
+        return FreecellState(tableau, free_cells, foundations)
+
+    def is_solved(self):
+        """Checks if every foundation is complete."""
+        return self.foundations == b'\x0d\x0d\x0d\x0d'
+
+    def child(self, move):
+        """
+        Applies a move (a Move or a (src, dest, num_cards) supermove tuple) followed by the automatic moves, and returns
+        the resulting search node with this state as its parent.
+        """
+        if isinstance(move, tuple):
+            new_state = self.execute_supermove(*move).apply_automatic_moves()
+        else:
+            new_state = self.apply_move(move).apply_automatic_moves()
+        new_state.parent = self
+        new_state.move = move
+        return new_state
+
+    def path(self):
+        """Returns the moves that lead from the root search node to this one, in order."""
+        moves = []
+        node = self
+        while node.parent is not None:
+            moves.append(node.move)
+            node = node.parent
+        moves.reverse()
+        return moves
+
+
+# Possible Moves ------------------------------------------------------------------------------------------------------------------------------
+
+
+    def can_move_to_foundation(self, c):
+        """Check if card `c` is the next card needed on its foundation."""
+        return self.foundations[SUIT[c]] == RANK[c] - 1
+
+    def can_move_to_tableau(self, c, col):
+        """Check if card `c` can be placed on tableau column `col`."""
+        column = self.tableau[col]
+        return not column or CAN_STACK[c * 52 + column[-1]]
+
+    def destinations(self, c, empty_columns):
+        """
+        Returns the tableau columns card `c` can be placed on, in column order. The cards `c` stacks on are looked up
+        in the card locations, so only the columns they are on top of are considered, plus the given empty columns.
+        """
+        locations, tableau = self.locations, self.tableau
+        columns = []
+        for top in STACK_TARGETS[c]:
+            location = locations[top]
+            if location < IN_FREECELL:
+                col, depth = divmod(location, COLUMN_STRIDE)
+                if depth == len(tableau[col]) - 1:
+                    columns.append(col)
+        if not columns:
+            return empty_columns
+        columns.extend(empty_columns)
+        columns.sort()
+        return columns
+
+    def empty_columns(self):
+        """Returns the indices of the empty tableau columns."""
+        return [i for i, col in enumerate(self.tableau) if not col] if self.free_columns else []
+
+    def get_possible_moves(self):
+        """
+        Generate all valid moves for BFS and DFS, in the same order as FreecellMove.get_possible_moves.
+        Moves out of the foundations are never generated since the solvers discard them.
+        """
+        moves = []
+        tableau, free_cells, foundations = self.tableau, self.free_cells, self.foundations
+        empty_columns = self.empty_columns()
+
+        for i, column in enumerate(tableau):
+            if column and foundations[SUIT[column[-1]]] == RANK[column[-1]] - 1:
+                moves.append(Move("tableau_to_foundation", i, SUITS[SUIT[column[-1]]]))
+
+        if self.occupied_cells < 4:
+            for i, column in enumerate(tableau):
+                if column:
+                    moves.append(Move("tableau_to_freecell", i, None))
+
+        for i, c in enumerate(free_cells):
+            if c != EMPTY and foundations[SUIT[c]] == RANK[c] - 1:
+                moves.append(Move("freecell_to_foundation", i, SUITS[SUIT[c]]))
+
+        for i, column in enumerate(tableau):
+            if column:
+                for j in self.destinations(column[-1], empty_columns):
+                    moves.append(Move("tableau_to_tableau", i, j))
+
+        for i, c in enumerate(free_cells):
+            if c != EMPTY:
+                for j in self.destinations(c, empty_columns):
+                    moves.append(Move("freecell_to_tableau", i, j))
+
+        return moves
+
+    def get_possible_moves_Astar(self, previous=None):
+        """
+        Generate all valid moves for A*, avoiding the reversal of the move that led from `previous` to this state.
+        """
+        moves = []
+        tableau, free_cells, foundations = self.tableau, self.free_cells, self.foundations
+        empty_columns = self.empty_columns()
+
+        for i, column in enumerate(tableau):
+            if column and foundations[SUIT[column[-1]]] == RANK[column[-1]] - 1:
+                moves.append(Move("tableau_to_foundation", i, SUITS[SUIT[column[-1]]]))
+
+        # Avoid filling a free cell right after one was emptied
+        if self.occupied_cells < 4 and not (previous and previous.occupied_cells > self.occupied_cells):
+            for i, column in enumerate(tableau):
+                if column:
+                    moves.append(Move("tableau_to_freecell", i, None))
+
+        # Avoid moving a card back onto the column it just left
+        for i, column in enumerate(tableau):
+            if column:
+                card = column[-1]
+                for j in self.destinations(card, empty_columns):
+                    if not (previous and previous.tableau[j] and previous.tableau[j][-1] == card):
+                        moves.append(Move("tableau_to_tableau", i, j))
+
+        for i, c in enumerate(free_cells):
+            if c != EMPTY and foundations[SUIT[c]] == RANK[c] - 1:
+                moves.append(Move("freecell_to_foundation", i, SUITS[SUIT[c]]))
+
+        for i, c in enumerate(free_cells):
+            if c != EMPTY:
+                for j in self.destinations(c, empty_columns):
+                    if not (previous and previous.tableau[j] and previous.tableau[j][-1] == c):
+                        moves.append(Move("freecell_to_tableau", i, j))
+
+        return moves
+
+    def reverses(self, move, previous):
+        """
+        Checks if get_possible_moves_Astar(previous) leaves out a move generated without `previous`: filling a free cell
+        right after one was emptied, or moving a card back onto the column it just left.
+        """
+        move_type = move.move_type
+        if move_type == "tableau_to_freecell":
+            return previous.occupied_cells > self.occupied_cells
+        if move_type == "tableau_to_tableau":
+            card = self.tableau[move.source][-1]
+        elif move_type == "freecell_to_tableau":
+            card = self.free_cells[move.source]
+        else:
+            return False
+        target = previous.tableau[move.destination]
+        return bool(target) and target[-1] == card
+
+    def supermove_lengths(self, src, dest):
+        """
+        Returns every number of cards (2 or more) that can be moved as a supermove from `src` to `dest`, following the
+        same rules as FreecellMove.supermove_lengths. The ordered run on top of `src` is read from the maintained runs,
+        so each candidate is checked in O(1).
+        """
+        column, target = self.tableau[src], self.tableau[dest]
+        if not column:
+            return ()
+
+        # (free cells + 1) * 2 ^ (empty columns other than the destination)
+        empty_columns = self.free_columns - (not target)
+        max_cards = min(self.runs[column[-1]], (4 - self.occupied_cells + 1) << empty_columns)
+        if not target:
+            # Any run fits on an empty column, but moving the whole column there would change nothing
+            return range(2, min(max_cards, len(column) - 1) + 1)
+
+        # Only the card one rank below the destination's top card can start the moved run
+        num_cards = RANK[target[-1]] - RANK[column[-1]]
+        if 2 <= num_cards <= max_cards and CAN_STACK[column[-num_cards] * 52 + target[-1]]:
+            return (num_cards,)
+        return ()
+
+    def get_possible_supermoves(self):
+        """
+        Returns every possible supermove as a tuple (source_column, destination_column, number_of_cards), one per legal
+        run length. Empty columns are interchangeable, so only the first one is used as a destination.
+        """
+        supermoves = []
+        tableau, runs = self.tableau, self.runs
+        first_empty = tableau.index(b'') if self.free_columns else None
+        for src in range(len(tableau)):
+            if tableau[src] and runs[tableau[src][-1]] >= 2:
+                for dest in range(len(tableau)):
+                    if src != dest and (tableau[dest] or dest == first_empty):
+                        for num_cards in self.supermove_lengths(src, dest):
+                            supermoves.append((src, dest, num_cards))
+        return supermoves
+
+
+# Move Executors ------------------------------------------------------------------------------------------------------------------------------
+
+
+    def apply_move(self, move):
+        """Applies a Move and returns the resulting PackedState. The move is assumed to be valid."""
+        move_type = move.move_type
+        tableau = list(self.tableau)
+        free_cells = self.free_cells
+        foundations = self.foundations
+        locations = bytearray(self.locations)
+        runs = self.runs
+        free_columns, occupied_cells = self.free_columns, self.occupied_cells
+        h, k = self.zobrist, self.canonical
+
+        if move_type == "tableau_to_foundation":
+            c, h, k = _pop(tableau, move.source, h, k)
+            z = Z_FOUNDATION[SUIT[c]][RANK[c] - 1] ^ Z_FOUNDATION[SUIT[c]][RANK[c]]
+            h, k = h ^ z, k ^ z
+            foundations = _set_byte(foundations, SUIT[c], RANK[c])
+            locations[c] = ON_FOUNDATION
+            free_columns += not tableau[move.source]
+        elif move_type == "tableau_to_freecell":
+            c, h, k = _pop(tableau, move.source, h, k)
+            slot = free_cells.index(EMPTY)
+            h, k = h ^ Z_FREECELL[c][slot], k ^ Z_FREECELL[c][ANY_SLOT]
+            free_cells = _set_byte(free_cells, slot, c)
+            locations[c] = IN_FREECELL + slot
+            free_columns += not tableau[move.source]
+            occupied_cells += 1
+        elif move_type == "freecell_to_foundation":
+            c = free_cells[move.source]
+            z = Z_FOUNDATION[SUIT[c]][RANK[c] - 1] ^ Z_FOUNDATION[SUIT[c]][RANK[c]]
+            h, k = h ^ z ^ Z_FREECELL[c][move.source], k ^ z ^ Z_FREECELL[c][ANY_SLOT]
+            free_cells = _set_byte(free_cells, move.source, EMPTY)
+            foundations = _set_byte(foundations, SUIT[c], RANK[c])
+            locations[c] = ON_FOUNDATION
+            occupied_cells -= 1
+        elif move_type == "tableau_to_tableau":
+            free_columns -= not tableau[move.destination]
+            c, h, k = _pop(tableau, move.source, h, k)
+            runs = bytearray(runs)
+            h, k = _push(tableau, move.destination, c, h, k, locations, runs)
+            free_columns += not tableau[move.source]
+        elif move_type == "freecell_to_tableau":
+            c = free_cells[move.source]
+            h, k = h ^ Z_FREECELL[c][move.source], k ^ Z_FREECELL[c][ANY_SLOT]
+            free_cells = _set_byte(free_cells, move.source, EMPTY)
+            free_columns -= not tableau[move.destination]
+            runs = bytearray(runs)
+            h, k = _push(tableau, move.destination, c, h, k, locations, runs)
+            occupied_cells -= 1
+        else:
+            raise ValueError(f"Unsupported move type for the solvers: {move_type}")
+
+        return PackedState(tuple(tableau), free_cells, foundations, h, k,
+                           bytes(locations), free_columns, occupied_cells, bytes(runs))
+
+    def execute_supermove(self, src, dest, num_cards):
+        """Moves the top `num_cards` cards of column `src` onto column `dest` and returns the resulting PackedState."""
+        tableau = list(self.tableau)
+        src_col, dest_col = tableau[src], tableau[dest]
+
+        # Only the lowest card of the moved sequence changes the card it sits on
+        c = src_col[-num_cards]
+        key = Z_TABLEAU[c]
+        if len(src_col) > num_cards:
+            h, k = self.zobrist ^ key[src_col[-num_cards - 1]], self.canonical ^ key[src_col[-num_cards - 1]]
+        else:
+            h, k = self.zobrist ^ key[BOTTOM + src], self.canonical ^ key[ANY_BOTTOM]
+        if dest_col:
+            h, k = h ^ key[dest_col[-1]], k ^ key[dest_col[-1]]
+        else:
+            h, k = h ^ key[BOTTOM + dest], k ^ key[ANY_BOTTOM]
+
+        # Every moved card changes location and run length: O(num_cards)
+        locations, runs = bytearray(self.locations), bytearray(self.runs)
+        base = COLUMN_STRIDE * dest + len(dest_col)
+        run = runs[dest_col[-1]] if dest_col and CAN_STACK[c * 52 + dest_col[-1]] else 0
+        for depth, moved in enumerate(src_col[-num_cards:], 1):
+            locations[moved] = base + depth - 1
+            runs[moved] = run + depth
+        free_columns = self.free_columns - (not dest_col) + (len(src_col) == num_cards)
+
+        tableau[dest] = dest_col + src_col[-num_cards:]
+        tableau[src] = src_col[:-num_cards]
+        return PackedState(tuple(tableau), self.free_cells, self.foundations, h, k,
+                           bytes(locations), free_columns, self.occupied_cells, bytes(runs))
+
+    def apply_automatic_moves(self):
+        """
+        Moves every card that is next needed on its foundation, from the tableau or the free cells, until no more
+        automatic moves are possible. Returns the resulting PackedState (or self if nothing moved).
+        """
+        tableau, free_cells, foundations = self.tableau, self.free_cells, self.foundations
+        # Fast path: nothing to move unless the next needed card of a suit is in a free cell or on top of its column
+        locations = self.locations
+        for s in range(4):
+            if foundations[s] < 13:
+                location = locations[s * 13 + foundations[s]]
+                if location >= IN_FREECELL or location % COLUMN_STRIDE == len(tableau[location // COLUMN_STRIDE]) - 1:
+                    break
+        else:
+            return self
+
+        tableau, free_cells, foundations = list(tableau), bytearray(free_cells), bytearray(foundations)
+        locations = bytearray(self.locations)
+        free_columns, occupied_cells = self.free_columns, self.occupied_cells
+        h, k = self.zobrist, self.canonical
+        moved = True
+        while moved:
+            moved = False
+            for i, col in enumerate(tableau):
+                while col and foundations[SUIT[col[-1]]] == RANK[col[-1]] - 1:
+                    c, h, k = _pop(tableau, i, h, k)
+                    z = Z_FOUNDATION[SUIT[c]][RANK[c] - 1] ^ Z_FOUNDATION[SUIT[c]][RANK[c]]
+                    h, k = h ^ z, k ^ z
+                    foundations[SUIT[c]] += 1
+                    locations[c] = ON_FOUNDATION
+                    col = tableau[i]
+                    free_columns += not col
+                    moved = True
+            for i, c in enumerate(free_cells):
+                if c != EMPTY and foundations[SUIT[c]] == RANK[c] - 1:
+                    z = Z_FOUNDATION[SUIT[c]][RANK[c] - 1] ^ Z_FOUNDATION[SUIT[c]][RANK[c]]
+                    h, k = h ^ z ^ Z_FREECELL[c][i], k ^ z ^ Z_FREECELL[c][ANY_SLOT]
+                    foundations[SUIT[c]] += 1
+                    free_cells[i] = EMPTY
+                    locations[c] = ON_FOUNDATION
+                    occupied_cells -= 1
+                    moved = True
+
+        return PackedState(tuple(tableau), bytes(free_cells), bytes(foundations), h, k,
+                           bytes(locations), free_columns, occupied_cells, self.runs)
+
+    def translate_move(self, move, target):
+        """
+        Rewrites a move (a Move or a (src, dest, num_cards) supermove tuple) that is valid on this state so that it does
+        the same thing on `target`, a state with the same canonical key but possibly different column and free cell
+        positions. Columns are matched by content (any empty column for an empty one) and free cells by card.
+        """
+        if target is self or target == self:
+            return move
+
+        def column(i):
+            col = self.tableau[i]
+            return target.tableau.index(col) if col else target.tableau.index(b'')
+
+        if isinstance(move, tuple):
+            src, dest, num_cards = move
+            return (column(src), column(dest), num_cards)
+
+        source, destination = move.source, move.destination
+        if move.move_type.startswith("tableau"):
+            source = column(source)
+        elif move.move_type.startswith("freecell"):
+            source = target.free_cells.index(self.free_cells[source])
+        if move.move_type.endswith("to_tableau"):
+            destination = column(destination)
+        return Move(move.move_type, source, destination)
+
+
+# Heuristic -----------------------------------------------------------------------------------------------------------------------------------
+
+
+    def heuristic(self):
+        """
+        Returns the same heuristic score as FreecellState.heuristic, without printing it. The score is computed once per
+        state and cached, so the heuristic weights must not change while a search is using the state.
+        """
+        if self.h is None:
+            self.h = self.compute_heuristic()
+        return self.h
+
+    def compute_heuristic(self):
+        """
+        Calculates the heuristic score of the state in O(1) from the maintained metadata: the next needed card of each
+        suit is looked up in the card locations instead of scanning the tableau.
+        """
+        w = HEURISTIC_WEIGHTS
+        foundations, locations, tableau = self.foundations, self.locations, self.tableau
+
+        foundation_score = 52 - sum(foundations)
+        blocked_next_cards = 0
+
+        # Penalize every next needed card still in the tableau by how deep it is buried
+        for s in range(4):
+            if foundations[s] < 13:
+                location = locations[s * 13 + foundations[s]]
+                if location < IN_FREECELL:
+                    col, depth = divmod(location, COLUMN_STRIDE)
+                    blocked_next_cards += len(tableau[col]) - depth
+
+        return (w['foundation'] * foundation_score +
+                w['blocked'] * blocked_next_cards / w['modifier'] +
+                w['fc'] * self.occupied_cells +
+                w['fcol'] * self.free_columns)
+
+
+# Dunder Methods ------------------------------------------------------------------------------------------------------------------------------
+
+
+    def __hash__(self):
+        """Returns the incrementally maintained Zobrist hash."""
+        return self.zobrist
+
+    def __eq__(self, other):
+        """Check if two PackedState instances are equal, comparing the hashes before the fields."""
+        return (self.zobrist == other.zobrist and
+                self.tableau == other.tableau and
+                self.free_cells == other.free_cells and
+                self.foundations == other.foundations)
+
+    def canonical_key(self):
+        """Returns a key that is equal for every state that only differs in column order or free cell slots."""
+        return CanonicalKey(self)
+
+    def __repr__(self):
+        """Return a string representation of the packed state."""
+        return f"PackedState(tableau={[list(col) for col in self.tableau]}, free_cells={list(self.free_cells)}, foundations={list(self.foundations)})"
+
+
+class CanonicalKey:
+    """
+    Duplicate-detection key that treats states as equal when they only differ in the order of the tableau columns or
+    in which free cell slot holds each card. The full comparison only runs when the canonical hashes match.
+    """
+    __slots__ = ('state', 'hash')
+
+    def __init__(self, state):
+        self.state = state
+        self.hash = state.canonical
+
+    def form(self):
+        """Returns the canonical form of the state: sorted columns, sorted free cells and the foundations."""
+        state = self.state
+        return (sorted(state.tableau), sorted(state.free_cells), state.foundations)
+
+    def __hash__(self):
+        """Returns the canonical Zobrist hash."""
+        return self.hash
+
+    def __eq__(self, other):
+        """Check if two keys belong to equivalent states."""
+        return self.hash == other.hash and (self.state is other.state or self.form() == other.form())
+
+
+def _pop(tableau, col, h, k):
+    """Removes the top card of `tableau[col]`, returning the card and the updated exact and canonical hashes."""
+    column = tableau[col]
+    c = column[-1]
+    if len(column) > 1:
+        z = Z_TABLEAU[c][column[-2]]
+        h, k = h ^ z, k ^ z
+    else:
+        h, k = h ^ Z_TABLEAU[c][BOTTOM + col], k ^ Z_TABLEAU[c][ANY_BOTTOM]
+    tableau[col] = column[:-1]
+    return c, h, k
+
+def _push(tableau, col, c, h, k, locations, runs):
+    """
+    Places card `c` on top of `tableau[col]`, updating its location and run length, and returns the updated exact and
+    canonical hashes.
+    """
+    column = tableau[col]
+    locations[c] = COLUMN_STRIDE * col + len(column)
+    runs[c] = runs[column[-1]] + 1 if column and CAN_STACK[c * 52 + column[-1]] else 1
+    if column:
+        z = Z_TABLEAU[c][column[-1]]
+        h, k = h ^ z, k ^ z
+    else:
+        h, k = h ^ Z_TABLEAU[c][BOTTOM + col], k ^ Z_TABLEAU[c][ANY_BOTTOM]
+    tableau[col] = column + bytes((c,))
+    return h, k
+
+def _set_byte(data, index, value):
+    """Returns a copy of the byte string `data` with `data[index]` replaced by `value`."""
+    return data[:index] + bytes((value,)) + data[index + 1:]
@@ -1,13 +1,22 @@
+import os
 from tkinter import Tk
 from FreecellMenu import FreecellMenu
+import FreecellCache
+
+CACHE_FILE = os.path.join("saves", "solver_cache.bin")
 
 def main():
     """The main function initializes the GUI for the Freecell game. It creates the root window and the FreecellMenu, then starts the Tkinter main loop."""
 
+    # Keep what the solvers learn across sessions
+    cache = FreecellCache.SolverCache(path=CACHE_FILE)
+    FreecellCache.set_cache(cache)
+
     # Initialize the game and GUI
     root = Tk()
     FreecellMenu(root)
     root.mainloop()
+    cache.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file